@@ -39,6 +39,9 @@ your end-users for any data transfer to Monta.
         # views
         "views/monta_order_status_views.xml",
         "views/sale_order_monta_sync_button.xml",
+        "views/product_views.xml",
+        "views/monta_circuit_state_views.xml",
+        "views/monta_response_cache_views.xml",
         # other data files (examples)
         # "data/monta_status_mapping_data.xml",
         # "data/monta_cron_jobs.xml",
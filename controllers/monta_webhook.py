@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import hmac
+import json
+import logging
+
+from odoo import http
+from odoo.http import request
+
+_logger = logging.getLogger(__name__)
+
+
+class MontaWebhookController(http.Controller):
+    """
+    Receives Monta order / shipment / event notifications and only queues them
+    (monta.webhook.event); the "Monta: Apply Webhook Events" cron applies them in batches.
+    Authentication: the shared secret in System Parameter monta.webhook_token, sent as
+    header X-Monta-Token (or ?token=). Without a configured token the endpoint is disabled.
+    """
+
+    @http.route("/monta/webhook", type="http", auth="public", methods=["POST"], csrf=False, save_session=False)
+    def monta_webhook(self, **kw):
+        expected = (request.env["ir.config_parameter"].sudo().get_param("monta.webhook_token") or "").strip()
+        given = request.httprequest.headers.get("X-Monta-Token") or kw.get("token") or ""
+        if not expected:
+            return request.make_json_response({"error": "webhook disabled"}, status=404)
+        if not hmac.compare_digest(expected.encode("utf-8"), str(given).encode("utf-8")):
+            _logger.warning("[Monta] Webhook rejected: bad token from %s", request.httprequest.remote_addr)
+            return request.make_json_response({"error": "unauthorized"}, status=401)
+
+        try:
+            body = json.loads(request.httprequest.get_data(as_text=True) or "null")
+        except ValueError:
+            return request.make_json_response({"error": "invalid JSON"}, status=400)
+        envelopes = body if isinstance(body, list) else [body]
+        queued = request.env["monta.webhook.event"].sudo()._ingest([e for e in envelopes if e])
+        return request.make_json_response({"queued": queued}, status=202)
@@ -138,6 +138,7 @@ def _remove_cron(env):
 # post-init and uninstall hooks (Odoo expects these names if referenced in manifest)
 def post_init_hook(env):
     _ensure_cron(env)
+    env["monta.sku.index"]._rebuild()
 
 
 def uninstall_hook(env):
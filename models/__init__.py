@@ -1,6 +1,7 @@
 from . import monta_sale_log
 from . import product_product
 from . import product_template
+from . import product_supplierinfo
 from . import sale_order
 from . import sale_order_line
 from . import sku_test_log
@@ -17,4 +18,10 @@ from . import monta_order_status_upsert
 from . import sale_order_monta_actions  
 from . import monta_qty_cron
 from . import sale_order_monta_fields
-from . import sale_order_monta_cron
\ No newline at end of file
+from . import sale_order_monta_cron
+from . import monta_stock_fingerprint
+from . import monta_sku_index
+from . import monta_webhook_event
+from . import monta_rate_limit
+from . import monta_circuit_state
+from . import monta_response_cache
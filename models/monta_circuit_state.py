@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models
+
+
+class MontaCircuitState(models.Model):
+    """
+    Last reported circuit breaker state per Monta account and endpoint. Written with raw SQL
+    by services/monta_circuit.py on every state change; shown read-only in the UI.
+    """
+    _name = "monta.circuit.state"
+    _description = "Monta API circuit breaker state"
+    _order = "state desc, endpoint"
+    _rec_name = "endpoint"
+
+    account_key = fields.Char(string="Monta Account Key", required=True, index=True)
+    endpoint = fields.Char(string="Endpoint", required=True)
+    state = fields.Selection(
+        selection=[("closed", "Closed"), ("open", "Open"), ("half_open", "Half-open (trial)")],
+        string="State", required=True, default="closed",
+    )
+    failures = fields.Integer(string="Consecutive Failures")
+    opened_at = fields.Datetime(string="Opened At (UTC)")
+    open_until = fields.Datetime(string="Open Until (UTC)")
+    last_error = fields.Char(string="Last Error")
+
+    _sql_constraints = [
+        ("monta_circuit_state_unique", "unique(account_key, endpoint)", "One circuit per account and endpoint."),
+    ]
@@ -33,6 +33,10 @@ class MontaOrderStatus(models.Model):
     )
     order_name = fields.Char(string="Order Name", index=True, required=True)
     monta_order_ref = fields.Char(string="Monta Order Ref", index=True)
+    monta_order_id = fields.Char(string="Monta Order Id", index=True,
+                                 help="Monta internal order Id; later resolves fetch orders/{Id} directly.")
+    match_strategy = fields.Char(string="Match Strategy",
+                                 help="Lookup that found this order in Monta (direct, orderNumber, reference, ...).")
 
     status = fields.Char(string="Order Status")
     status_code = fields.Integer(string="Status Code")
@@ -56,6 +60,10 @@ class MontaOrderStatus(models.Model):
     last_sync = fields.Datetime(string="Last Sync (UTC)", default=fields.Datetime.now, index=True)
 
     status_raw = fields.Text(string="Raw Status (JSON)")
+    miss_count = fields.Integer(string="Consecutive Misses", default=0,
+                                help="Syncs in a row that did not find this order in Monta.")
+    next_retry_at = fields.Datetime(string="Next Lookup After (UTC)", index=True,
+                                    help="Unresolved orders are not looked up again before this time (exponential backoff).")
     on_monta = fields.Boolean(string="Available on Monta", compute="_compute_on_monta", store=True, index=True)
 
     _sql_constraints = [
@@ -176,30 +184,27 @@ class MontaOrderStatus(models.Model):
         return self.sudo().create(base_vals)
 
     # ---------------- constraints ----------------
-    @api.constrains("monta_order_ref", "order_name", "monta_account_key")
-    def _check_unique_nonempty_monta_ref(self):
+    def init(self):
         """
-        Skip the constraint logic safely if the DB column doesn't exist yet (during upgrade window).
+        One non-empty Monta ref per account, enforced by a partial unique index instead of a
+        search per record. Rows without an account key count as one account.
+        Skipped (with a warning) while duplicates from older versions still exist.
         """
-        has_col = self._db_has_column("monta_account_key")
-        for r in self:
-            ref = (r.monta_order_ref or "").strip()
-            if not ref:
-                continue
-            if not has_col:
-                # Can't enforce per-account uniqueness until column exists.
-                # Log once per record to aid ops.
-                _logger.warning(
-                    "[Monta] Uniqueness check skipped for %s (missing DB column monta_account_key).",
-                    r.display_name
-                )
-                continue
-            dup = self.search([
-                ("id", "!=", r.id),
-                ("monta_account_key", "=", r.monta_account_key),
-                ("monta_order_ref", "=", ref),
-            ], limit=1)
-            if dup:
-                raise ValidationError(
-                    _("Monta Order Ref '%s' already exists on order %s in this account.") % (ref, dup.order_name)
-                )
+        cr = self.env.cr
+        cr.execute("SELECT 1 FROM pg_indexes WHERE indexname=%s", ("monta_order_status_ref_account_uniq",))
+        if cr.fetchone():
+            return
+        cr.execute("""
+            SELECT COALESCE(monta_account_key, ''), monta_order_ref FROM monta_order_status
+             WHERE COALESCE(monta_order_ref, '') <> ''
+             GROUP BY 1, 2 HAVING count(*) > 1 LIMIT 5
+        """)
+        dups = cr.fetchall()
+        if dups:
+            _logger.warning("[Monta] Not creating unique index on Monta refs; duplicates exist: %s", dups)
+            return
+        cr.execute("""
+            CREATE UNIQUE INDEX monta_order_status_ref_account_uniq
+                ON monta_order_status (COALESCE(monta_account_key, ''), monta_order_ref)
+             WHERE COALESCE(monta_order_ref, '') <> ''
+        """)
@@ -1,7 +1,10 @@
 #models/monta_order_status_upsert.py
 # -*- coding: utf-8 -*-
+import logging
 from odoo import api, fields, models
 
+_logger = logging.getLogger(__name__)
+
 class MontaOrderStatus(models.Model):
     _inherit = "monta.order.status"
 
@@ -10,6 +13,8 @@ class MontaOrderStatus(models.Model):
         v = {}
         mapping = {
             "monta_order_ref": ["monta_order_ref"],
+            "monta_order_id": ["monta_order_id"],
+            "match_strategy": ["match_strategy"],
             "status": ["status", "order_status"],
             "status_code": ["status_code", "monta_status_code"],
             "source": ["source", "monta_status_source"],
@@ -50,22 +55,72 @@ class MontaOrderStatus(models.Model):
     def upsert_for_order(self, so, **vals):
         if not so or not getattr(so, "id", False):
             raise ValueError("upsert_for_order requires a valid sale.order record")
+        return self.upsert_many([(so, vals)])
+
+    @api.model
+    def upsert_many(self, pairs):
+        """
+        Bulk snapshot upsert: pairs = [(sale.order, vals), ...] with the same vals as
+        upsert_for_order. Existing rows and clashing Monta refs are each looked up with one
+        query; a ref already used by another order is dropped (the unique index would refuse it).
+        Returns the snapshot records in input order.
+        """
+        pairs = [(so, vals) for so, vals in pairs if so and so.id]
+        if not pairs:
+            return self.browse()
+        Sudo = self.sudo()
+        account_key = self._current_account_key()
 
-        payload = self._normalize_vals(vals)
+        payloads = []
+        for so, vals in pairs:
+            payload = self._normalize_vals(vals)
+            payload.update({"sale_order_id": so.id, "order_name": so.name})
+            if account_key:
+                payload["monta_account_key"] = account_key
+            payloads.append(payload)
+        names = list({p["order_name"] for p in payloads})
 
-        if "sale_order_id" in self._fields:
-            payload["sale_order_id"] = so.id
-        if "order_name" in self._fields:
-            payload["order_name"] = so.name
+        # existing rows of this account, or legacy ones without a key (one query); the table is
+        # unique on (order_name, monta_account_key), so another account's row is never reused
+        domain = [("order_name", "in", names)]
+        if account_key:
+            domain.append(("monta_account_key", "in", [account_key, False]))
+        existing = {}
+        for rec in Sudo.search(domain, order="id"):
+            current = existing.get(rec.order_name)
+            if not current or (rec.monta_account_key == account_key and current.monta_account_key != account_key):
+                existing[rec.order_name] = rec
 
-        domain = []
-        if "order_name" in self._fields:
-            domain = [("order_name", "=", so.name)]
-        elif "sale_order_id" in self._fields:
-            domain = [("sale_order_id", "=", so.id)]
+        # Monta refs already held by other orders (one query), and duplicates inside the batch
+        refs = list({p["monta_order_ref"] for p in payloads if p.get("monta_order_ref")})
+        owner = {}
+        if refs:
+            domain = [("monta_order_ref", "in", refs)]
+            if account_key:
+                domain.append(("monta_account_key", "in", [account_key, False]))
+            for row in Sudo.search_read(domain, ["monta_order_ref", "order_name"]):
+                owner.setdefault(row["monta_order_ref"], row["order_name"])
+        for p in payloads:
+            ref = p.get("monta_order_ref")
+            if not ref:
+                continue
+            holder = owner.setdefault(ref, p["order_name"])
+            if holder != p["order_name"]:
+                _logger.warning("Blocked duplicate Monta ref %s for order %s in this account (already used by %s).",
+                                ref, p["order_name"], holder)
+                p.pop("monta_order_ref")
 
-        rec = self.sudo().search(domain, limit=1) if domain else self.browse()
-        if rec:
-            rec.write(payload)
-            return rec
-        return self.sudo().create(payload)
+        # one write/create per order; later pairs for the same order win
+        merged = {}
+        for p in payloads:
+            merged.setdefault(p["order_name"], {}).update(p)
+        to_create = []
+        for name, p in merged.items():
+            if name in existing:
+                existing[name].write(p)
+            else:
+                to_create.append(p)
+        if to_create:
+            for rec in Sudo.create(to_create):
+                existing[rec.order_name] = rec
+        return Sudo.browse([existing[p["order_name"]].id for p in payloads])
@@ -2,6 +2,7 @@
 
 from odoo import api, models, SUPERUSER_ID
 from ..services.monta_qty_sync import MontaQtySync
+from ..services.monta_stock_pull import MontaStockPull
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -11,15 +12,25 @@ class ProductProduct(models.Model):
     _inherit = "product.product"
 
     @api.model
-    def cron_monta_qty_sync(self, limit=None):
+    def cron_monta_qty_sync(self, limit=None, force=False):
         """
         Entry point for the 6-hour cron job or manual run.
 
         NOTE: Do NOT call self.env.sudo() here (safe_eval context can complain).
         The service already sudo()s only on the models that need it (ICP, etc.).
+        force=True re-applies every SKU, ignoring the delta fingerprints.
         """
-        _logger.info("Running Monta Qty Sync (limit=%s)", limit)
-        MontaQtySync(self.env).run(limit=limit)
+        _logger.info("Running Monta Qty Sync (limit=%s, force=%s)", limit, force)
+        MontaQtySync(self.env).run(limit=limit, force=force)
+
+    @api.model
+    def cron_monta_stock_pull(self, limit=None, force=False):
+        """
+        Entry point for the 6-hour /stock pull cron.
+        Commits after every applied chunk so a failure mid-catalog keeps earlier progress.
+        """
+        _logger.info("Running Monta Stock Pull (limit=%s, force=%s)", limit, force)
+        return MontaStockPull(self.env).pull_and_apply(limit=limit, force=force, commit=True)
 
 
 def post_init_hook(cr, registry):
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from odoo import fields, models
+
+
+class MontaRateLimit(models.Model):
+    """
+    Token bucket state per Monta account. Maintained with raw SQL by
+    services/monta_rate_limit.py; the model only defines the table and exposes it read-only.
+    """
+    _name = "monta.rate.limit"
+    _description = "Monta API rate limit bucket (per account)"
+    _order = "account_key"
+
+    account_key = fields.Char(string="Monta Account Key", required=True)
+    tokens = fields.Float(string="Tokens Left", digits=(16, 2))
+    updated_at = fields.Datetime(string="Last Refill (UTC)")
+    blocked_until = fields.Datetime(string="Blocked Until (UTC)", help="Set from Monta's Retry-After on HTTP 429.")
+    throttled_count = fields.Integer(string="429 Responses")
+
+    _sql_constraints = [
+        ("monta_rate_limit_account_unique", "unique(account_key)", "One rate limit bucket per Monta account."),
+    ]
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+
+class MontaResponseCacheStat(models.Model):
+    """
+    Hit / revalidation / miss counters of the Monta response cache per account and endpoint.
+    Counted with raw SQL by services/monta_response_cache.py. init() also creates the
+    cache table itself, UNLOGGED and outside the ORM.
+    """
+    _name = "monta.response.cache.stat"
+    _description = "Monta API response cache statistics"
+    _order = "account_key, endpoint"
+    _rec_name = "endpoint"
+
+    account_key = fields.Char(string="Monta Account Key", required=True, index=True)
+    endpoint = fields.Char(string="Endpoint", required=True)
+    hits = fields.Integer(string="Hits", help="Answered from the cache without calling Monta.")
+    revalidated = fields.Integer(string="Revalidated", help="Stale entry confirmed by Monta with 304 Not Modified.")
+    misses = fields.Integer(string="Misses", help="Full response fetched from Monta.")
+    hit_rate = fields.Float(string="Hit Rate (%)", compute="_compute_hit_rate", digits=(16, 1))
+
+    _sql_constraints = [
+        ("monta_response_cache_stat_unique", "unique(account_key, endpoint)",
+         "One counter row per account and endpoint."),
+    ]
+
+    @api.depends("hits", "revalidated", "misses")
+    def _compute_hit_rate(self):
+        for rec in self:
+            total = rec.hits + rec.revalidated + rec.misses
+            rec.hit_rate = 100.0 * (rec.hits + rec.revalidated) / total if total else 0.0
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE UNLOGGED TABLE IF NOT EXISTS monta_response_cache (
+                cache_key     varchar PRIMARY KEY,
+                account_key   varchar NOT NULL,
+                endpoint      varchar,
+                status        integer NOT NULL,
+                body          text NOT NULL,
+                etag          varchar,
+                last_modified varchar,
+                stored_at     timestamp NOT NULL,
+                expires_at    timestamp NOT NULL
+            )
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS monta_response_cache_stored_at_idx
+                ON monta_response_cache (stored_at)
+        """)
+
+    @api.model
+    def _cron_monta_purge_response_cache(self, max_age_hours=24):
+        """Drop entries not refreshed for max_age_hours; recent stale ones are kept for revalidation."""
+        self.env.cr.execute("""
+            DELETE FROM monta_response_cache
+             WHERE stored_at < (now() AT TIME ZONE 'UTC') - %s * interval '1 hour'
+        """, (max_age_hours,))
+        _logger.info("[Monta] Purged %s response cache entries", self.env.cr.rowcount)
+        return True
+
+    def action_monta_clear_response_cache(self):
+        self.env.cr.execute("TRUNCATE monta_response_cache")
+        self.search([]).unlink()
+        return True
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import logging
+from odoo import api, fields, models
+from odoo.tools import split_every
+
+from ..utils.sku import resolve_sku, normalize_sku
+
+_logger = logging.getLogger(__name__)
+
+# Same order as utils.sku.resolve_sku; used to break ties when two products share a SKU
+SOURCE_RANK = {
+    "monta_sku": 0,
+    "default_code": 1,
+    "supplier_code": 2,
+    "barcode": 3,
+    "template_default_code": 4,
+}
+
+
+class MontaSkuIndex(models.Model):
+    _name = "monta.sku.index"
+    _description = "Monta SKU -> product lookup (effective SKU per resolve_sku)"
+    _order = "sku_key, id"
+
+    sku = fields.Char(string="SKU", required=True)
+    sku_key = fields.Char(string="Normalized SKU", required=True, index=True)
+    product_id = fields.Many2one("product.product", string="Product", required=True, ondelete="cascade", index=True)
+    source = fields.Selection(
+        selection=[(k, k) for k in SOURCE_RANK],
+        string="Source", required=True,
+    )
+
+    _sql_constraints = [
+        ("monta_sku_index_product_unique", "unique(product_id)", "One Monta SKU index row per product."),
+    ]
+
+    def init(self):
+        # keys from when matching was case-insensitive
+        self.env.cr.execute("UPDATE monta_sku_index SET sku_key = btrim(sku) WHERE sku_key IS DISTINCT FROM btrim(sku)")
+
+    # ---------------- maintenance ----------------
+    @api.model
+    def _refresh_products(self, products):
+        """Recompute the index rows of the given products (delete + recreate)."""
+        products = products.exists()
+        if not products:
+            return
+        for chunk in split_every(1000, products.ids, self.env["product.product"].browse):
+            self.sudo().search([("product_id", "in", chunk.ids)]).unlink()
+            vals_list = []
+            for p in chunk.with_context(active_test=False):
+                sku, src = resolve_sku(p, env=self.env, allow_synthetic=False)
+                if sku:
+                    vals_list.append({"sku": sku, "sku_key": normalize_sku(sku), "product_id": p.id, "source": src})
+            if vals_list:
+                self.sudo().create(vals_list)
+
+    @api.model
+    def _rebuild(self):
+        products = self.env["product.product"].with_context(active_test=False).search([])
+        self.sudo().search([]).unlink()
+        self._refresh_products(products)
+        _logger.info("[Monta] SKU index rebuilt for %s products", len(products))
+
+    # ---------------- lookup ----------------
+    @api.model
+    def _resolve_many(self, skus):
+        """
+        Bulk SKU -> product.product (active products only) with one indexed query.
+        Returns {sku as given: product}; unknown SKUs are absent.
+        """
+        keys = {}
+        for s in skus or []:
+            k = normalize_sku(s)
+            if k:
+                keys.setdefault(k, []).append(s)
+        if not keys:
+            return {}
+        if not self.sudo().search_count([], limit=1):
+            self._rebuild()
+
+        rows = self.sudo().search([("sku_key", "in", list(keys)), ("product_id.active", "=", True)])
+        best = {}
+        for r in rows:
+            cur = best.get(r.sku_key)
+            if not cur or (SOURCE_RANK[r.source], r.product_id.id) < (SOURCE_RANK[cur.source], cur.product_id.id):
+                best[r.sku_key] = r
+        out = {}
+        for k, row in best.items():
+            for s in keys[k]:
+                out[s] = row.product_id
+        return out
+
+    @api.model
+    def _skus_for(self, products):
+        """product.id -> effective Monta SKU for the given products (one query)."""
+        rows = self.sudo().search([("product_id", "in", products.ids)])
+        found = {r.product_id.id: r.sku for r in rows}
+        missing = products.filtered(lambda p: p.id not in found)
+        if missing:
+            self._refresh_products(missing)
+            found.update({r.product_id.id: r.sku for r in self.sudo().search([("product_id", "in", missing.ids)])})
+        return found
+
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import logging
+from odoo import api, fields, models
+from odoo.tools import split_every
+
+_logger = logging.getLogger(__name__)
+
+
+class MontaStockFingerprint(models.Model):
+    _name = "monta.stock.fingerprint"
+    _description = "Monta stock values last applied per SKU (delta sync)"
+    _order = "scope, sku"
+
+    scope = fields.Selection(
+        selection=[("qty_sync", "Qty sync"), ("stock_pull", "Stock pull")],
+        string="Scope", required=True, index=True,
+    )
+    sku = fields.Char(string="SKU", required=True, index=True)
+    fingerprint = fields.Char(string="Fingerprint", required=True)
+
+    _sql_constraints = [
+        ("monta_stock_fingerprint_unique", "unique(scope, sku)",
+         "Only one fingerprint per scope and SKU."),
+    ]
+
+    # ---------------- helpers ----------------
+    @api.model
+    def _hash(self, values, account="") -> str:
+        """Hash of the Monta values for one SKU, scoped to a Monta account key."""
+        raw = "|".join([account] + ["%.6f" % float(v or 0.0) for v in values])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @api.model
+    def _changed(self, scope, values_by_sku):
+        """
+        values_by_sku: {sku: (value, ...)} as just read from Monta.
+        Returns the set of SKUs whose values differ from the last remembered run.
+        """
+        if not values_by_sku:
+            return set()
+        self.env.cr.execute(
+            "SELECT sku, fingerprint FROM monta_stock_fingerprint WHERE scope=%s AND sku IN %s",
+            (scope, tuple(values_by_sku)),
+        )
+        known = dict(self.env.cr.fetchall())
+        account = self.env["monta.order.status"]._current_account_key()
+        return {sku for sku, vals in values_by_sku.items() if known.get(sku) != self._hash(vals, account)}
+
+    @api.model
+    def _remember(self, scope, values_by_sku):
+        """Store the fingerprints of SKUs that were applied successfully (chunked upsert)."""
+        if not values_by_sku:
+            return
+        account = self.env["monta.order.status"]._current_account_key()
+        rows = [(scope, sku, self._hash(vals, account), self.env.uid, self.env.uid) for sku, vals in values_by_sku.items()]
+        for chunk in split_every(1000, rows):
+            values_sql = ",".join(["(%s,%s,%s,%s,%s,now() at time zone 'UTC',now() at time zone 'UTC')"] * len(chunk))
+            self.env.cr.execute(
+                f"""
+                INSERT INTO monta_stock_fingerprint (scope, sku, fingerprint, create_uid, write_uid, create_date, write_date)
+                VALUES {values_sql}
+                ON CONFLICT (scope, sku) DO UPDATE
+                   SET fingerprint = EXCLUDED.fingerprint,
+                       write_uid = EXCLUDED.write_uid,
+                       write_date = EXCLUDED.write_date
+                """,
+                [p for row in chunk for p in row],
+            )
+        self.invalidate_model(["fingerprint"])
+        _logger.info("[Monta] Remembered %s %s fingerprint(s)", len(rows), scope)
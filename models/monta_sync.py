@@ -1,10 +1,52 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import json
 import logging
+import math
+import time
+from datetime import timedelta
 from odoo import api, fields, models
-from odoo.tools import float_utils
+from odoo.tools import float_utils, split_every
+
+from ..services.monta_status_normalizer import MontaStatusNormalizer
 
 _logger = logging.getLogger(__name__)
 
+# negative cache: first retry after MISS_BACKOFF_MINUTES, doubling per miss up to MISS_BACKOFF_MAX_HOURS
+MISS_BACKOFF_MINUTES = 30
+MISS_BACKOFF_MAX_HOURS = 24
+
+# statuses/codes considered final-delivery states (adjust as needed)
+DELIVERED_NORMALIZED = ("delivered", "completed", "done", "delivered_to_customer", "delivered_ok")
+DELIVERED_CODES = ("DELIVERED", "DELIVERED_OK", "DELIVERED_CONFIRMED")
+
+# pickings validated per savepoint/commit by the delivered-pickings job
+VALIDATE_CHUNK = 20
+# runs of that job an order may fail before it's left for manual validation
+VALIDATE_MAX_ATTEMPTS = 5
+
+# minutes until the next status poll per normalized stage; None = never poll again
+POLL_INTERVALS = {
+    "shipped": 30,
+    "picked": 30,
+    "processing": 60,
+    "received": 120,
+    "unknown": 60,
+    "error": 240,
+    "backorder": 720,
+    "delivered": None,
+    "cancelled": None,
+}
+
+# share of each status batch reserved for the round-robin sweep over all open orders
+SWEEP_SHARE = 0.25
+CRON_MINUTES = {"minutes": 1, "hours": 60, "days": 1440, "weeks": 10080, "months": 43200}
+
+# re-read this much before the watermark so rows written while the last listing ran aren't missed
+DELTA_OVERLAP = timedelta(minutes=2)
+# orders whose changed rows failed to apply, re-resolved per delta/webhook run
+DELTA_RETRY_LIMIT = 100
+
 class MontaOrderStatus(models.Model):
     _inherit = "monta.order.status"
 
@@ -75,12 +117,59 @@ class MontaOrderStatus(models.Model):
         match = self._best_match(name, _as_list(recent))
         return match or {}
 
+    @api.model
+    def _monta_resolve_hints(self, refs):
+        """{order_name: {"id", "strategy"}} of already-resolved orders in the current account (one query)."""
+        refs = [r for r in refs if r]
+        if not refs:
+            return {}
+        domain = [("order_name", "in", refs), ("monta_order_id", "!=", False)]
+        account = self._current_account_key()
+        if account:
+            # snapshots written before account keys were recorded carry none
+            domain.append(("monta_account_key", "in", [account, False]))
+        rows = self.sudo().search_read(domain, ["order_name", "monta_order_id", "match_strategy"])
+        return {r["order_name"]: {"id": r["monta_order_id"], "strategy": r["match_strategy"]} for r in rows}
+
+    @api.model
+    def _monta_backing_off(self, refs):
+        """Order names whose last lookups missed and whose retry time hasn't come yet (one query)."""
+        refs = [r for r in refs if r]
+        if not refs or self.env.context.get("monta_ignore_backoff"):
+            return set()
+        rows = self.sudo().search_read(
+            [("order_name", "in", refs), ("next_retry_at", ">", fields.Datetime.now())], ["order_name"])
+        return {r["order_name"] for r in rows}
+
+    def _monta_register_miss(self):
+        """Bump the miss counter and push next_retry_at out exponentially."""
+        ICP = self.env["ir.config_parameter"].sudo()
+        base = int(ICP.get_param("monta.miss_backoff_minutes") or MISS_BACKOFF_MINUTES)
+        cap = timedelta(hours=int(ICP.get_param("monta.miss_backoff_max_hours") or MISS_BACKOFF_MAX_HOURS))
+        now = fields.Datetime.now()
+        for rec in self:
+            misses = rec.miss_count + 1
+            delay = min(timedelta(minutes=base * 2 ** min(misses - 1, 16)), cap)
+            rec.write({"miss_count": misses, "next_retry_at": now + delay})
+
+    def _monta_clear_miss(self):
+        missed = self.filtered(lambda r: r.miss_count or r.next_retry_at)
+        if missed:
+            missed.write({"miss_count": 0, "next_retry_at": False})
+
     @api.model
     def _resolve_and_upsert(self, so):
         if not so or not so.name:
             return False
+        if self._monta_backing_off([so.name]):
+            return False
         data = self._monta_get_order(so.name)
         if not data:
+            # an order Monta never knew has no snapshot yet: create it so the miss (and backoff) sticks
+            self.sudo().upsert_for_order(
+                so, order_status=False, delivery_message="Order not found in Monta",
+                last_sync=fields.Datetime.now(),
+            )._monta_register_miss()
             return False
         vals = {"order_name": so.name, "sale_order_id": so.id,
                 "status": data.get("Status"), "monta_order_ref": data.get("OrderNumber")}
@@ -89,6 +178,7 @@ class MontaOrderStatus(models.Model):
             rec.sudo().write(vals)
         else:
             rec = self.sudo().create(vals)
+        rec._monta_clear_miss()
         return rec
 
 
@@ -104,7 +194,25 @@ class SaleOrder(models.Model):
         selection=[("shipments","Shipments"),("orderevents","Order Events"),("orders","Orders Header")],
         string="Monta Status Source", copy=False)
     monta_track_trace = fields.Char(string="Monta Track & Trace", copy=False)
-    monta_last_sync = fields.Datetime(string="Monta Last Sync", copy=False)
+    monta_last_sync = fields.Datetime(string="Monta Last Sync", copy=False, index=True)
+    monta_status_hash = fields.Char(
+        string="Monta Status Fingerprint", copy=False,
+        help="Hash of the last mirrored status values; unchanged results only bump the sync time.")
+    monta_validate_pending = fields.Boolean(
+        string="Monta Delivered, Validation Pending", copy=False, index=True,
+        help="Monta reported the order delivered; its pickings wait for the validation job.")
+    monta_status_retry = fields.Boolean(
+        string="Monta Status Retry", copy=False, index=True,
+        help="Applying a reported Monta change failed; the next delta/webhook run resolves this order again.")
+    monta_validate_attempts = fields.Integer(
+        string="Monta Validation Attempts", copy=False,
+        help="Failed runs of the delivered-pickings validation job for this order.")
+    monta_next_poll_at = fields.Datetime(
+        string="Monta Next Poll", copy=False, index=True,
+        help="When the status crons look this order up again; empty = as soon as possible.")
+    monta_poll_done = fields.Boolean(
+        string="Monta Polling Done", copy=False, index=True,
+        help="Monta reported a final status (delivered/cancelled); the status crons skip this order.")
 
     def _monta_candidate_reference(self):
         self.ensure_one()
@@ -112,184 +220,530 @@ class SaleOrder(models.Model):
 
     def action_monta_sync_status(self):
         _logger.info("[Monta] Manual sync for %d sales orders", len(self))
-        self._monta_sync_batch()
+        # a manual sync always asks Monta, even for orders in miss backoff
+        self.with_context(monta_ignore_backoff=not self.env.context.get("cron_run"))._monta_sync_batch()
         return True
 
+    @api.model
+    def _monta_due_domain(self):
+        """Orders not on a final status whose next poll is due or not scheduled yet (new / pre-schedule orders)."""
+        return [("monta_poll_done", "=", False),
+                "|", ("monta_next_poll_at", "<=", fields.Datetime.now()), ("monta_next_poll_at", "=", False)]
+
+    @api.model
+    def _monta_next_poll(self, status, miss=None):
+        """Next poll time for a resolved status (None = never), or at the miss retry time."""
+        if miss is not None:
+            return miss.next_retry_at or False
+        intervals = dict(POLL_INTERVALS)
+        try:
+            intervals.update(json.loads(self.env["ir.config_parameter"].sudo().get_param("monta.poll_intervals") or "{}"))
+        except ValueError:
+            _logger.warning("[Monta] Ignoring invalid monta.poll_intervals")
+        stage = MontaStatusNormalizer.normalize(status)
+        minutes = intervals.get(stage, intervals.get("unknown"))
+        if minutes is None:
+            return False
+        return fields.Datetime.now() + timedelta(minutes=int(minutes))
+
     @api.model
     def cron_monta_sync_status(self, batch_limit=200):
-        domain = [("state","in",["sale","done"]), ("monta_status","!=", "Shipped")]
-        orders = self.search(domain, limit=batch_limit, order="write_date desc")
-        _logger.info("[Monta] Cron sync starting for %d orders", len(orders))
+        mode = (self.env["ir.config_parameter"].sudo().get_param("monta.status_sync_mode") or "full").strip()
+        # Part of the batch resumes the id-ordered sweep so every open order is refreshed within a
+        # bounded time, in delta mode too; the rest goes to orders whose scheduled poll is due.
+        sweep, cursor = self._monta_sweep_slice(batch_limit)
+        if mode == "delta":
+            try:
+                if self._monta_sync_delta():
+                    if sweep:
+                        _logger.info("[Monta] Delta sync done; sweeping %d open orders", len(sweep))
+                        sweep._monta_sync_batch()
+                        self.env["ir.config_parameter"].sudo().set_param("monta.status_sweep_cursor", str(cursor))
+                    return True
+            except Exception as e:
+                _logger.exception("[Monta] Delta sync failed, falling back to full batch: %s", e)
+        domain = [("state","in",["sale","done"]), ("id", "not in", sweep.ids)] + self._monta_due_domain()
+        due = self.search(domain, limit=max(batch_limit - len(sweep), 0), order="monta_next_poll_at asc nulls first, id")
+        orders = due | sweep
+        _logger.info("[Monta] Cron sync starting for %d orders (%d due, %d sweep)", len(orders), len(due), len(sweep))
         orders._monta_sync_batch()
+        if sweep:
+            self.env["ir.config_parameter"].sudo().set_param("monta.status_sweep_cursor", str(cursor))
         _logger.info("[Monta] Cron sync finished")
         return True
 
-    def _monta_sync_batch(self):
+    @api.model
+    def _monta_open_domain(self):
+        """Orders still polled: confirmed, and not parked on a final status."""
+        return [("state","in",["sale","done"]), ("monta_poll_done", "=", False)]
+
+    @api.model
+    def _monta_sweep_slice(self, batch_limit):
+        """
+        Next slice of the round-robin sweep: open orders with id after the stored cursor,
+        wrapping around to the lowest ids. Returns (orders, new cursor).
+        """
+        ICP = self.env["ir.config_parameter"].sudo()
+        share = float(ICP.get_param("monta.status_sweep_share") or SWEEP_SHARE)
+        size = int(batch_limit * share) if share > 0 else 0
+        if size <= 0:
+            return self.browse(), 0
+        cursor = int(ICP.get_param("monta.status_sweep_cursor") or 0)
+        domain = self._monta_open_domain()
+
+        orders = self.search(domain + [("id", ">", cursor)], limit=size, order="id")
+        new_cursor = orders[-1].id if orders else cursor
+        if len(orders) < size:
+            wrapped = self.search(domain + [("id", "<=", cursor)], limit=size - len(orders), order="id")
+            if wrapped:
+                orders |= wrapped
+                new_cursor = wrapped[-1].id
+
+        open_count = self.search_count(domain)
+        cron = self.env["ir.cron"].sudo().search([("code", "ilike", "cron_monta_sync_status")], limit=1)
+        interval = (cron.interval_number * CRON_MINUTES.get(cron.interval_type, 1)) if cron else 30
+        _logger.info("[Monta] Status sweep from id %s: %d open orders, %d per run -> full sweep every %d minutes",
+                     cursor, open_count, size, math.ceil(open_count / size) * interval)
+        return orders, new_cursor
+
+    @api.model
+    def _monta_sync_delta(self):
+        """
+        Incremental status sync: pull orders / shipments / order events changed since the
+        watermark in bulk listings, match them to open sale orders in memory and evaluate
+        them from those rows. Only orders seen in the listings without a header row fall
+        back to a per-order resolve(). Returns False when there is no watermark yet
+        (the caller runs a full batch first).
+        """
         from ..services.monta_status_resolver import MontaStatusResolver
+        ICP = self.env["ir.config_parameter"].sudo()
+        started = fields.Datetime.now()
+
+        watermark = ICP.get_param("monta.status_delta_watermark")
+        if not watermark:
+            ICP.set_param("monta.status_delta_watermark", fields.Datetime.to_string(started))
+            _logger.info("[Monta] Delta sync: no watermark yet, running a full batch first")
+            return False
+
+        resolver = MontaStatusResolver(self.with_context(monta_no_cache=True).env)
+        changed = resolver.changed_since(fields.Datetime.from_string(watermark) - DELTA_OVERLAP)
+
+        # orders that fail to apply are flagged monta_status_retry, so the watermark may move on
+        resolved, missed = self._monta_apply_changed_rows(resolver, changed)
+        resolver.save_capabilities()
+        ICP.set_param("monta.status_delta_watermark", fields.Datetime.to_string(started))
+        _logger.info("[Monta] Delta sync since %s: %s orders / %s shipments / %s events listed, "
+                     "%s matched from listings, %s resolved individually",
+                     watermark, len(changed.get("orders") or []), len(changed.get("shipments") or []),
+                     len(changed.get("orderevents") or []), resolved, missed)
+        return True
+
+    @api.model
+    def _monta_apply_changed_rows(self, resolver, changed):
+        """
+        Apply Monta rows that are known to have changed (delta listings, webhooks):
+        changed = {"orders": [...], "shipments": [...], "orderevents": [...]}.
+        Rows are matched to open sale orders in memory; orders with a header row are evaluated
+        from the rows, the others fall back to resolve(). Orders left over from a failed earlier
+        run (monta_status_retry) are resolved again. Returns (evaluated, resolved individually).
+        """
         Snapshot = self.env["monta.order.status"].sudo()
 
-        try:
-            resolver = MontaStatusResolver(self.env)
-        except Exception as e:
-            _logger.exception("[Monta] Resolver init failed (check System Parameters): %s", e)
-            return
+        # open orders named by a reference in the rows, by lower-cased reference (one indexed query)
+        names = set()
+        for kind in ("orders", "shipments", "orderevents"):
+            for row in changed.get(kind) or []:
+                names |= {v for value in resolver._ref_values(row) for v in (value, value.upper())}
+        by_ref = {}
+        if names:
+            # open = not on a final status; Shipped orders must match so Shipped -> Delivered is caught
+            domain = self._monta_open_domain() + [("name", "in", list(names))]
+            by_ref = {str(r["name"]).strip().lower(): r["id"] for r in self.search_read(domain, ["name"])}
+        retry = self.search([("monta_status_retry", "=", True), ("state", "in", ["sale", "done"])],
+                            limit=DELTA_RETRY_LIMIT, order="id")
+
+        def _match(row):
+            for k in resolver._ref_keys(row):
+                if k in by_ref:
+                    return by_ref[k]
+            return None
+
+        headers, ships, events = {}, {}, {}
+        for row in changed.get("orders") or []:
+            so_id = _match(row)
+            if so_id:
+                headers[so_id] = row
+        for kind, bucket in (("shipments", ships), ("orderevents", events)):
+            for row in changed.get(kind) or []:
+                so_id = _match(row)
+                if so_id:
+                    bucket.setdefault(so_id, []).append(row)
+
+        def _newest_first(rows):
+            return sorted(rows, key=lambda e: str(resolver._pick(e, "Timestamp", "CreatedDate", "EventDate", "Date") or ""), reverse=True)
+
+        resolved = missed = 0
+        touched, snapshots = {}, []
+        failed = self.browse()
+        for so in self.browse(sorted(set(headers) | set(ships) | set(events) | set(retry.ids))):
+            ref = so._monta_candidate_reference()
+            try:
+                if so.id in headers:
+                    # rows absent from the listing haven't changed; None lets evaluate() read them
+                    status, meta = resolver.evaluate(
+                        ref, headers[so.id],
+                        shipments=ships.get(so.id),
+                        events=_newest_first(events[so.id]) if so.id in events else None,
+                    )
+                    resolved += 1
+                else:
+                    status, meta = resolver.resolve(ref, hint=Snapshot._monta_resolve_hints([ref]).get(ref))
+                    missed += 1
+            except Exception as e:
+                _logger.exception("[Monta] %s (%s) -> evaluate from changed rows failed: %s", so.name, ref, e)
+                failed |= so
+                continue
+            so._monta_apply_status(status, meta, Snapshot, touched=touched, snapshots=snapshots)
 
-        # statuses/codes considered final-delivery states (adjust as needed)
-        DELIVERED_NORMALIZED = ("delivered", "completed", "done", "delivered_to_customer", "delivered_ok")
-        DELIVERED_CODES = ("DELIVERED", "DELIVERED_OK", "DELIVERED_CONFIRMED")
+        self._monta_flush_snapshots(Snapshot, snapshots)
+        self._monta_touch_synced(touched)
+        (retry - failed).write({"monta_status_retry": False})
+        (failed - retry).write({"monta_status_retry": True})
+        if failed:
+            _logger.warning("[Monta] %d order(s) failed to apply; retried on the next run", len(failed))
+        return resolved, missed
 
+    def _monta_sync_batch(self):
+        from ..services.monta_status_resolver import resolve_parallel
+        Snapshot = self.env["monta.order.status"].sudo()
+        workers = int(self.env["ir.config_parameter"].sudo().get_param("monta.status_sync_workers") or 8)
+
+        refs = {}
         for so in self:
             ref = so._monta_candidate_reference()
             if not ref:
                 _logger.warning("[Monta] %s has no reference; skipping", so.display_name)
                 continue
+            refs[so.id] = ref
 
-            try:
-                status, meta = resolver.resolve(ref)
-            except Exception as e:
-                _logger.exception("[Monta] %s (%s) -> resolve() failed: %s", so.name, ref, e)
-                continue
+        # Negative cache: orders Monta didn't know last time wait for their retry time
+        backing_off = Snapshot._monta_backing_off(refs.values())
+        if backing_off:
+            _logger.info("[Monta] Skipping %d order(s) in miss backoff", len(backing_off))
+            refs = {k: v for k, v in refs.items() if v not in backing_off}
 
-            # Not found -> mark as not available on Monta, upsert snapshot with reason
-            if not status:
-                try:
-                    if "monta_on_monta" in so._fields:
-                        so.write({"monta_on_monta": False})
-                    Snapshot.upsert_for_order(
-                        so,
-                        order_status=False,
-                        delivery_message=(meta or {}).get("reason"),
-                        status_raw=(meta or {}).get("status_raw"),
-                        last_sync=fields.Datetime.now(),
-                    )
-                except Exception:
-                    _logger.exception("[Monta] Snapshot upsert failed for %s on not-found", so.name)
-                _logger.warning("[Monta] %s (%s) -> no status returned (%s)", so.name, ref, meta)
+        # Fetch phase: network only, concurrent
+        try:
+            results = resolve_parallel(self.env, refs.values(), max_workers=workers,
+                                       hints=Snapshot._monta_resolve_hints(refs.values()))
+        except Exception as e:
+            _logger.exception("[Monta] Resolver init failed (check System Parameters): %s", e)
+            return
+
+        # Apply phase: single-threaded ORM writes
+        touched, snapshots = {}, []
+        for so in self.filtered(lambda o: o.id in refs):
+            ref = refs[so.id]
+            res = results.get(ref)
+            if isinstance(res, Exception) or res is None:
+                _logger.error("[Monta] %s (%s) -> resolve() failed: %s", so.name, ref, res,
+                              exc_info=res if isinstance(res, Exception) else None)
                 continue
+            status, meta = res
+            so._monta_apply_status(status, meta, Snapshot, touched=touched, snapshots=snapshots)
 
-            # Found -> write mirrors on sale.order (including Available on Monta)
-            vals_so = {
-                "monta_status": status,
-                "monta_status_code": (meta or {}).get("status_code"),
-                "monta_status_source": (meta or {}).get("source") or "orders",
-                "monta_track_trace": (meta or {}).get("track_trace"),
-                "monta_last_sync": fields.Datetime.now(),
-            }
-
-            # Optional mirrors if you’ve added them (safe checks)
-            if "monta_order_ref" in so._fields:
-                vals_so["monta_order_ref"] = (meta or {}).get("monta_order_ref")
-            if "monta_delivery_message" in so._fields:
-                vals_so["monta_delivery_message"] = (meta or {}).get("delivery_message")
-            if "monta_delivery_date" in so._fields:
-                vals_so["monta_delivery_date"] = (meta or {}).get("delivery_date")
-            if "monta_status_raw" in so._fields:
-                vals_so["monta_status_raw"] = (meta or {}).get("status_raw")
-
-            # NEW: mirror Available on Monta (true if we have a stable Monta ref)
-            if "monta_on_monta" in so._fields:
-                vals_so["monta_on_monta"] = bool((meta or {}).get("monta_order_ref"))
-
-            # Write to SO
-            try:
-                so.write(vals_so)
-            except Exception as e:
-                _logger.exception("[Monta] %s (%s) -> write failed: %s", so.name, ref, e)
+        # end for so
+        self._monta_flush_snapshots(Snapshot, snapshots)
+        self._monta_touch_synced(touched)
+        return True
+
+    # values that only record when we looked; not part of the status fingerprint
+    _MONTA_UNHASHED = ("monta_last_sync", "monta_next_poll_at", "monta_poll_done", "monta_status_raw",
+                       "monta_status_hash", "monta_validate_pending", "monta_validate_attempts")
+
+    @api.model
+    def _monta_status_fingerprint(self, vals, meta):
+        payload = {k: v for k, v in vals.items() if k not in self._MONTA_UNHASHED}
+        payload["_ids"] = [(meta or {}).get("monta_order_id"), (meta or {}).get("match_strategy")]
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @api.model
+    def _monta_touch_synced(self, touched):
+        """
+        Record a sync of orders whose status didn't change without going through write():
+        touched = {next_poll_at or False: [sale.order ids]}; one UPDATE per distinct value and chunk.
+        No next poll means the (found) status is final. The orders were found, so their misses are cleared.
+        """
+        if not touched:
+            return
+        self.flush_model(["monta_last_sync", "monta_next_poll_at", "monta_poll_done"])
+        self.env["monta.order.status"].flush_model(["last_sync", "miss_count", "next_retry_at"])
+        now = fields.Datetime.now()
+        for next_poll, ids in touched.items():
+            for chunk in split_every(1000, ids):
+                self.env.cr.execute(
+                    "UPDATE sale_order SET monta_last_sync=%s, monta_next_poll_at=%s, monta_poll_done=%s "
+                    "WHERE id IN %s",
+                    (now, next_poll or None, not next_poll, tuple(chunk)),
+                )
+                self.env.cr.execute(
+                    "UPDATE monta_order_status SET last_sync=%s, miss_count=0, next_retry_at=NULL "
+                    "WHERE sale_order_id IN %s",
+                    (now, tuple(chunk)),
+                )
+        self.invalidate_model(["monta_last_sync", "monta_next_poll_at", "monta_poll_done"])
+        self.env["monta.order.status"].invalidate_model(["last_sync", "miss_count", "next_retry_at"])
+        _logger.info("[Monta] %d order(s) unchanged; only their sync time was updated",
+                     sum(len(ids) for ids in touched.values()))
+
+    @api.model
+    def _monta_flush_snapshots(self, Snapshot, snapshots):
+        """
+        Upsert the snapshots collected during an apply phase in one batch. Orders whose snapshot
+        couldn't be written lose their status fingerprint, so the next sync writes them again.
+        """
+        if not snapshots:
+            return
+        try:
+            with self.env.cr.savepoint():
+                Snapshot.upsert_many(snapshots)._monta_clear_miss()
+        except Exception as e:
+            _logger.warning("[Monta] Batched snapshot upsert failed (%s); retrying per order", e)
+            for so, vals in snapshots:
+                try:
+                    with self.env.cr.savepoint():
+                        Snapshot.upsert_for_order(so, **vals)._monta_clear_miss()
+                except Exception as e_one:
+                    _logger.exception("[Monta] Snapshot upsert failed for %s: %s", so.name, e_one)
+                    so.write({"monta_status_hash": False})
+
+    def _monta_apply_status(self, status, meta, Snapshot, touched=None, snapshots=None):
+        """
+        Mirror one resolved Monta status on this order (fields, snapshot, delivered pickings).
+        Unchanged results (same fingerprint) are collected in `touched` for _monta_touch_synced,
+        snapshot values in `snapshots` for _monta_flush_snapshots; without them both happen right away.
+        """
+        self.ensure_one()
+        so = self
+        ref = so._monta_candidate_reference()
 
-            # Snapshot for history/audit
+        # Not found -> mark as not available on Monta, upsert snapshot with reason
+        if not status:
             try:
-                Snapshot.upsert_for_order(
+                if "monta_on_monta" in so._fields:
+                    so.write({"monta_on_monta": False})
+                rec = Snapshot.upsert_for_order(
                     so,
-                    monta_order_ref=(meta or {}).get("monta_order_ref") or so.name,
-                    order_status=status,
-                    delivery_message=(meta or {}).get("delivery_message"),
-                    track_trace_url=(meta or {}).get("track_trace"),
-                    delivery_date=(meta or {}).get("delivery_date"),
+                    order_status=False,
+                    delivery_message=(meta or {}).get("reason"),
                     status_raw=(meta or {}).get("status_raw"),
                     last_sync=fields.Datetime.now(),
                 )
-            except Exception as e:
-                _logger.exception("[Monta] Snapshot upsert failed for %s: %s", so.name, e)
+                rec._monta_register_miss()
+                # drop the fingerprint so the next hit is written in full (monta_on_monta, snapshot, misses)
+                so.write({"monta_next_poll_at": so._monta_next_poll(status, miss=rec), "monta_poll_done": False,
+                          "monta_status_hash": False})
+                _logger.warning("[Monta] %s (%s) -> no status returned (miss #%s, next lookup after %s)",
+                                so.name, ref, rec.miss_count, rec.next_retry_at)
+            except Exception:
+                _logger.exception("[Monta] Snapshot upsert failed for %s on not-found", so.name)
+            return
 
-            # ---------------------------
-            # Auto-validate pickings on delivered
-            # ---------------------------
-            try:
-                normalized_status = str(status or "").strip().lower()
-                status_code = str((meta or {}).get("status_code") or "").strip()
-                is_delivered = False
-
-                if normalized_status in DELIVERED_NORMALIZED:
-                    is_delivered = True
-                elif status_code.upper() in DELIVERED_CODES:
-                    is_delivered = True
-                # allow explicit meta flag if resolver provides one
-                elif (meta or {}).get("is_delivered") in (True, "true", "True", "1", 1):
-                    is_delivered = True
-
-                if not is_delivered:
-                    # nothing to do for pickings
-                    continue
+        # Found -> write mirrors on sale.order (including Available on Monta)
+        vals_so = {
+            "monta_status": status,
+            "monta_status_code": (meta or {}).get("status_code"),
+            "monta_status_source": (meta or {}).get("source") or "orders",
+            "monta_track_trace": (meta or {}).get("track_trace"),
+            "monta_last_sync": fields.Datetime.now(),
+            "monta_next_poll_at": so._monta_next_poll(status),
+        }
+        vals_so["monta_poll_done"] = not vals_so["monta_next_poll_at"]
+
+        # Optional mirrors if you’ve added them (safe checks)
+        if "monta_order_ref" in so._fields:
+            vals_so["monta_order_ref"] = (meta or {}).get("monta_order_ref")
+        if "monta_delivery_message" in so._fields:
+            vals_so["monta_delivery_message"] = (meta or {}).get("delivery_message")
+        if "monta_delivery_date" in so._fields:
+            vals_so["monta_delivery_date"] = (meta or {}).get("delivery_date")
+        if "monta_status_raw" in so._fields:
+            vals_so["monta_status_raw"] = (meta or {}).get("status_raw")
+
+        # NEW: mirror Available on Monta (true if we have a stable Monta ref)
+        if "monta_on_monta" in so._fields:
+            vals_so["monta_on_monta"] = bool((meta or {}).get("monta_order_ref"))
+
+        # Delivered -> queue the pickings for the validation job (_monta_validate_delivered_pickings)
+        if so._monta_is_delivered(status, meta):
+            vals_so["monta_validate_pending"] = True
+            vals_so["monta_validate_attempts"] = 0
+
+        # Unchanged since the last sync: no write, no snapshot, no picking pass
+        fingerprint = so._monta_status_fingerprint(vals_so, meta)
+        if so.monta_status_hash == fingerprint:
+            if touched is None:
+                so._monta_touch_synced({vals_so["monta_next_poll_at"]: [so.id]})
+            else:
+                touched.setdefault(vals_so["monta_next_poll_at"], []).append(so.id)
+            return
+        vals_so["monta_status_hash"] = fingerprint
 
-                # find pickings linked to the sale.order
-                Picking = self.env["stock.picking"].sudo()
-                # search by sale_id or origin
-                domain = ["|", ("sale_id", "=", so.id), ("origin", "=", so.name)]
-                pickings = Picking.search(domain, order="id asc")
+        # Write to SO
+        try:
+            so.write(vals_so)
+        except Exception as e:
+            _logger.exception("[Monta] %s (%s) -> write failed: %s", so.name, ref, e)
+
+        # Snapshot for history/audit (batched by the caller when it passes `snapshots`)
+        snapshot_vals = dict(
+            monta_order_ref=(meta or {}).get("monta_order_ref") or so.name,
+            monta_order_id=(meta or {}).get("monta_order_id"),
+            match_strategy=(meta or {}).get("match_strategy"),
+            order_status=status,
+            delivery_message=(meta or {}).get("delivery_message"),
+            track_trace_url=(meta or {}).get("track_trace"),
+            delivery_date=(meta or {}).get("delivery_date"),
+            status_raw=(meta or {}).get("status_raw"),
+            last_sync=fields.Datetime.now(),
+        )
+        if snapshots is not None:
+            snapshots.append((so, snapshot_vals))
+        else:
+            try:
+                with self.env.cr.savepoint():
+                    Snapshot.upsert_for_order(so, **snapshot_vals)._monta_clear_miss()
+            except Exception as e:
+                _logger.exception("[Monta] Snapshot upsert failed for %s: %s", so.name, e)
+                so.write({"monta_status_hash": False})
 
-                if not pickings:
-                    _logger.warning("[Monta] No pickings found for %s to mark delivered", so.name)
-                    continue
+    # ---------------------------
+    # Auto-validate pickings on delivered (deferred job)
+    # ---------------------------
+    @api.model
+    def _monta_is_delivered(self, status, meta):
+        normalized_status = str(status or "").strip().lower()
+        status_code = str((meta or {}).get("status_code") or "").strip()
+        if normalized_status in DELIVERED_NORMALIZED:
+            return True
+        if status_code.upper() in DELIVERED_CODES:
+            return True
+        # allow explicit meta flag if resolver provides one
+        return (meta or {}).get("is_delivered") in (True, "true", "True", "1", 1)
 
-                for pick in pickings:
+    @api.model
+    def _monta_fill_done_quantities(self, pick):
+        # If there are move lines, ensure qty_done is populated
+        # For Odoo >= 14/15/16/18 the field is move_line_ids (stock.move.line)
+        if pick.move_line_ids:
+            for ml in pick.move_line_ids:
+                # set qty_done to product_uom_qty if it's zero or less than required
+                wanted = ml.product_uom_qty or 0.0
+                # rounding from the move line uom
+                rounding = ml.product_uom_id.rounding if ml.product_uom_id else ml.product_uom.rounding
+                if float_utils.float_compare(ml.qty_done or 0.0, wanted, precision_rounding=rounding) < 0:
+                    ml.qty_done = wanted
+        else:
+            # older style: no move_line_ids (rare in v18), fill move_lines.quantity_done
+            for mv in pick.move_lines:
+                wanted = mv.product_uom_qty or 0.0
+                rounding = mv.product_uom.rounding
+                if float_utils.float_compare(getattr(mv, "quantity_done", 0.0), wanted, precision_rounding=rounding) < 0:
+                    # try to set attribute if present
                     try:
-                        # Skip if already done or cancelled
-                        if pick.state in ("done", "cancel"):
-                            _logger.debug("[Monta] Skipping picking %s - state %s", pick.name, pick.state)
-                            continue
-
-                        # If there are move lines, ensure qty_done is populated
-                        # For Odoo >= 14/15/16/18 the field is move_line_ids (stock.move.line)
-                        if pick.move_line_ids:
-                            for ml in pick.move_line_ids:
-                                # set qty_done to product_uom_qty if it's zero or less than required
-                                wanted = ml.product_uom_qty or 0.0
-                                # rounding from the move line uom
-                                rounding = ml.product_uom_id.rounding if ml.product_uom_id else ml.product_uom.rounding
-                                if float_utils.float_compare(ml.qty_done or 0.0, wanted, precision_rounding=rounding) < 0:
-                                    ml.qty_done = wanted
-                        else:
-                            # older style: no move_line_ids (rare in v18), fill move_lines.quantity_done
-                            for mv in pick.move_lines:
-                                wanted = mv.product_uom_qty or 0.0
-                                rounding = mv.product_uom.rounding
-                                if float_utils.float_compare(getattr(mv, "quantity_done", 0.0), wanted, precision_rounding=rounding) < 0:
-                                    # try to set attribute if present
-                                    try:
-                                        mv.quantity_done = wanted
-                                    except Exception:
-                                        # fallback: create move_line entries is complex; warn and skip
-                                        _logger.warning("[Monta] Unable to set quantity_done on move %s (picking %s)", mv.id, pick.name)
-
-                        # Try to validate the picking. Use force_validate context to avoid blocking on small differences.
-                        try:
-                            pick.with_context(force_validate=True).button_validate()
-                            _logger.info("[Monta] Auto-validated picking %s for sale %s", pick.name, so.name)
-                        except Exception as e_val:
-                            # Fallback: sometimes action_done() works for custom modules
-                            try:
-                                pick.action_done()
-                                _logger.info("[Monta] action_done succeeded for picking %s (fallback)", pick.name)
-                            except Exception as e2:
-                                _logger.exception("[Monta] Failed to validate picking %s for sale %s: %s / %s", pick.name, so.name, e_val, e2)
-                    except Exception as e_pick:
-                        _logger.exception("[Monta] Exception while processing picking %s for sale %s: %s", pick.name if pick else "n/a", so.name, e_pick)
-
-            except Exception as e:
-                _logger.exception("[Monta] Exception while attempting to auto-validate pickings for %s: %s", so.name, e)
-
-        # end for so
-        return True
+                        mv.quantity_done = wanted
+                    except Exception:
+                        # fallback: create move_line entries is complex; warn and skip
+                        _logger.warning("[Monta] Unable to set quantity_done on move %s (picking %s)", mv.id, pick.name)
 
+    @api.model
+    def _monta_validate_picking(self, pick, so_name):
+        """Fill done quantities and validate one picking; returns True on success."""
+        self._monta_fill_done_quantities(pick)
+        # Try to validate the picking. Use force_validate context to avoid blocking on small differences.
+        try:
+            pick.with_context(force_validate=True).button_validate()
+            return True
+        except Exception as e_val:
+            # Fallback: sometimes action_done() works for custom modules
+            try:
+                pick.action_done()
+                _logger.info("[Monta] action_done succeeded for picking %s (fallback)", pick.name)
+                return True
+            except Exception as e2:
+                _logger.error("[Monta] Failed to validate picking %s for sale %s: %s / %s", pick.name, so_name, e_val, e2)
+                return False
 
-#
\ No newline at end of file
+    @api.model
+    def _monta_validate_delivered_pickings(self, limit=200, chunk_size=VALIDATE_CHUNK, commit=False):
+        """
+        Validate the open pickings of orders Monta reported delivered (monta_validate_pending).
+        All pickings of the batch (and their moves / move lines) are loaded up front; each
+        picking runs in its own savepoint, and with commit=True every chunk is committed.
+        Orders with a failed picking stay pending and are retried on the next run, up to
+        VALIDATE_MAX_ATTEMPTS runs.
+        """
+        orders = self.search([("monta_validate_pending", "=", True)], limit=limit,
+                             order="monta_validate_attempts, id")
+        if not orders:
+            return 0
+        Picking = self.env["stock.picking"].sudo()
+        # search by sale_id or origin, for the whole batch at once
+        pickings = Picking.search(
+            ["|", ("sale_id", "in", orders.ids), ("origin", "in", orders.mapped("name")),
+             ("state", "not in", ("done", "cancel"))], order="id asc")
+        # prefetch moves and move lines of every picking in one go
+        pickings.mapped("move_line_ids").mapped("product_uom_id")
+        pickings.mapped("move_ids")
+
+        by_name = {o.name: o for o in orders}
+        validated = failed = 0
+        failed_ids = set()
+        timings = []
+        for chunk in split_every(chunk_size, pickings.ids, Picking.browse):
+            for pick in chunk:
+                so = pick.sale_id if pick.sale_id in orders else by_name.get(pick.origin)
+                so_name = so.name if so else pick.origin
+                started = time.perf_counter()
+                try:
+                    with self.env.cr.savepoint():
+                        ok = self._monta_validate_picking(pick, so_name)
+                except Exception as e_pick:
+                    ok = False
+                    _logger.exception("[Monta] Exception while processing picking %s for sale %s: %s", pick.name, so_name, e_pick)
+                elapsed = (time.perf_counter() - started) * 1000.0
+                timings.append((elapsed, pick.name))
+                if ok:
+                    validated += 1
+                    _logger.info("[Monta] Auto-validated picking %s for sale %s in %.0f ms", pick.name, so_name, elapsed)
+                else:
+                    failed += 1
+                    failed_ids.add(so.id if so else None)
+            if commit:
+                self.env.cr.commit()
+
+        covered_ids, covered_names = set(pickings.sale_id.ids), set(pickings.mapped("origin"))
+        for so in orders:
+            if so.id not in covered_ids and so.name not in covered_names:
+                _logger.warning("[Monta] No pickings found for %s to mark delivered", so.name)
+        done = orders.filtered(lambda o: o.id not in failed_ids)
+        done.write({"monta_validate_pending": False, "monta_validate_attempts": 0})
+        for so in orders - done:
+            attempts = so.monta_validate_attempts + 1
+            vals = {"monta_validate_attempts": attempts}
+            if attempts >= VALIDATE_MAX_ATTEMPTS:
+                vals["monta_validate_pending"] = False
+                _logger.error("[Monta] Giving up validating the pickings of %s after %d attempts; validate them manually",
+                              so.name, attempts)
+            so.write(vals)
+        if commit:
+            self.env.cr.commit()
+
+        slowest = max(timings) if timings else (0.0, "-")
+        _logger.info("[Monta] Delivered pickings: %d orders, %d pickings validated, %d failed (slowest %s: %.0f ms)",
+                     len(orders), validated, failed, slowest[1], slowest[0])
+        return validated
+
+
+#
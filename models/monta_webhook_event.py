@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+# webhook kind -> key of the "changed rows" dict used by sale.order._monta_apply_changed_rows
+KIND_ROWS = {"order": "orders", "shipment": "shipments", "event": "orderevents"}
+
+APPLY_BATCH = 500
+
+
+class MontaWebhookEvent(models.Model):
+    _name = "monta.webhook.event"
+    _description = "Monta webhook notification (ingest queue)"
+    _order = "id"
+
+    kind = fields.Selection(
+        selection=[("order", "Order"), ("shipment", "Shipment"), ("event", "Order Event"), ("unknown", "Unknown")],
+        string="Kind", required=True, default="unknown", index=True,
+    )
+    order_ref = fields.Char(string="Order Reference", index=True)
+    payload = fields.Text(string="Payload (JSON)", required=True)
+    state = fields.Selection(
+        selection=[("pending", "Pending"), ("done", "Done"), ("error", "Error")],
+        string="State", required=True, default="pending", index=True,
+    )
+    error = fields.Text(string="Error")
+    processed_at = fields.Datetime(string="Processed At")
+
+    # ---------------- ingest ----------------
+    @staticmethod
+    def _classify(envelope):
+        """(kind, row) of one notification: {"Type": ..., "Data": {...}} or the bare Monta object."""
+        if not isinstance(envelope, dict):
+            return "unknown", {}
+        row = envelope.get("Data") or envelope.get("Payload") or envelope
+        row = row if isinstance(row, dict) else {}
+        typ = str(envelope.get("Type") or envelope.get("EventType") or envelope.get("type") or "").lower()
+        if "ship" in typ or "colli" in typ:
+            return "shipment", row
+        if "event" in typ:
+            return "event", row
+        if "order" in typ:
+            return "order", row
+        if any(k in row for k in ("ShipmentStatus", "TrackAndTraceCode", "ShippedDate")) and "Shipment" not in row:
+            return "shipment", row
+        if any(k in row for k in ("ActionCode", "EventDate")):
+            return "event", row
+        if any(k in row for k in ("OrderNumber", "Reference", "ClientReference")):
+            return "order", row
+        return "unknown", row
+
+    @api.model
+    def _ingest(self, envelopes):
+        """Queue notifications as received; no matching or Monta calls here. Returns the count."""
+        from ..services.monta_status_resolver import MontaStatusResolver
+        vals_list = []
+        for envelope in envelopes:
+            kind, row = self._classify(envelope)
+            refs = sorted(MontaStatusResolver._ref_keys(row)) if row else []
+            vals_list.append({
+                "kind": kind,
+                "order_ref": refs[0] if refs else False,
+                "payload": json.dumps(row or envelope, ensure_ascii=False, default=str),
+            })
+        if vals_list:
+            self.sudo().create(vals_list)
+        return len(vals_list)
+
+    # ---------------- apply ----------------
+    @api.model
+    def _apply_pending(self, limit=APPLY_BATCH):
+        """Apply one batch of queued notifications through the delta-sync matching; returns the batch size."""
+        from ..services.monta_status_resolver import MontaStatusResolver
+        events = self.sudo().search([("state", "=", "pending")], limit=limit)
+        if not events:
+            return 0
+
+        changed = {"orders": [], "shipments": [], "orderevents": []}
+        bad = unknown = self.browse()
+        for ev in events:
+            if ev.kind not in KIND_ROWS:
+                unknown |= ev
+                continue
+            try:
+                row = json.loads(ev.payload)
+            except ValueError:
+                bad |= ev
+                continue
+            if not isinstance(row, dict):
+                bad |= ev
+                continue
+            changed[KIND_ROWS[ev.kind]].append(row)
+        # a later header of the same order supersedes earlier ones (events are applied in id order)
+        latest = {}
+        for row in changed["orders"]:
+            latest[tuple(sorted(MontaStatusResolver._ref_keys(row)))] = row
+        changed["orders"] = list(latest.values())
+
+        now = fields.Datetime.now()
+        if bad:
+            bad.write({"state": "error", "error": "Invalid JSON payload (expected an object)", "processed_at": now})
+        if unknown:
+            unknown.write({"state": "error", "error": "Unrecognised notification type", "processed_at": now})
+        todo = events - bad - unknown
+        try:
+            resolver = MontaStatusResolver(self.with_context(monta_no_cache=True).env)
+            with self.env.cr.savepoint():
+                evaluated, resolved = self.env["sale.order"]._monta_apply_changed_rows(resolver, changed)
+            resolver.save_capabilities()
+        except Exception as e:
+            _logger.exception("[Monta] Applying %d webhook event(s) failed: %s", len(todo), e)
+            todo.write({"state": "error", "error": str(e), "processed_at": now})
+            return len(events)
+        todo.write({"state": "done", "processed_at": now})
+        _logger.info("[Monta] Webhooks: applied %d event(s) (%d orders evaluated, %d resolved individually)",
+                     len(todo), evaluated, resolved)
+        return len(events)
+
+    @api.model
+    def _cron_monta_apply_webhooks(self, limit=APPLY_BATCH):
+        """Cron: drain the webhook queue batch by batch, committing after each batch."""
+        while self._apply_pending(limit=limit) >= limit:
+            self.env.cr.commit()
+        return True
+
+    @api.model
+    def _cron_monta_purge_webhooks(self, days=14):
+        cutoff = fields.Datetime.subtract(fields.Datetime.now(), days=days)
+        self.sudo().search([("state", "=", "done"), ("processed_at", "<", cutoff)]).unlink()
+        return True
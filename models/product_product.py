@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 import logging
-from odoo import models, fields
+import math
+from odoo import api, models, fields
+
+from ..utils.kit import phantom_boms
 
 _logger = logging.getLogger(__name__)
 
@@ -12,10 +15,47 @@ class ProductProduct(models.Model):
         help="Explicit SKU for Monta. If empty, connector tries: default_code → first supplier code → barcode → template.default_code."
     )
 
+    monta_kit_available_packs = fields.Integer(
+        string="Available Packs (Monta)",
+        readonly=True,
+        copy=False,
+        help="Kits only: packs that can be built from component stock, capped by Monta StockAvailable. "
+             "Updated by the Monta qty sync."
+    )
+    monta_is_kit = fields.Boolean(
+        string="Is Kit (Monta)",
+        compute='_compute_monta_is_kit',
+        help="Phantom BoM (variant BoM first, then the template BoM), as used by the Monta qty sync."
+    )
+
+    @api.depends('product_tmpl_id')
+    def _compute_monta_is_kit(self):
+        kits = phantom_boms(self.env, self)
+        for prod in self:
+            prod.monta_is_kit = prod.id in kits
+
+    def _monta_set_kit_available_packs(self, packs_by_id):
+        """Write floor(packs) on kits, one write per distinct value and only where it changed."""
+        groups = {}
+        for prod in self:
+            value = int(math.floor(packs_by_id.get(prod.id, 0.0)))
+            if prod.monta_kit_available_packs != value:
+                groups.setdefault(value, []).append(prod.id)
+        for value, ids in groups.items():
+            self.browse(ids).write({'monta_kit_available_packs': value})
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        recs = super().create(vals_list)
+        self.env['monta.sku.index']._refresh_products(recs)
+        return recs
+
     def write(self, vals):
         res = super().write(vals)
-        # If identifiers changed, trigger resync for related open orders
+        # If identifiers changed, keep the SKU index current and trigger resync for related open orders
         sku_related = {'monta_sku', 'default_code', 'barcode', 'seller_ids'}
+        if sku_related.intersection(vals.keys()) or 'product_tmpl_id' in vals:
+            self.env['monta.sku.index']._refresh_products(self)
         if sku_related.intersection(vals.keys()):
             try:
                 self._trigger_monta_resync_for_open_orders()
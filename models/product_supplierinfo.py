@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from odoo import api, models
+
+
+class ProductSupplierinfo(models.Model):
+    _inherit = 'product.supplierinfo'
+
+    def _monta_index_products(self):
+        return self.product_id | self.product_tmpl_id.with_context(active_test=False).product_variant_ids
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        recs = super().create(vals_list)
+        self.env['monta.sku.index']._refresh_products(recs._monta_index_products())
+        return recs
+
+    def write(self, vals):
+        products = self._monta_index_products()
+        res = super().write(vals)
+        if {'product_code', 'product_id', 'product_tmpl_id', 'sequence'}.intersection(vals):
+            self.env['monta.sku.index']._refresh_products(products | self._monta_index_products())
+        return res
+
+    def unlink(self):
+        products = self._monta_index_products()
+        res = super().unlink()
+        self.env['monta.sku.index']._refresh_products(products)
+        return res
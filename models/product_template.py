@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 import json
 import logging
-from odoo import models
+from odoo import fields, models
 
 from ..utils.sku import resolve_sku
 from ..utils.pack import get_pack_components, expand_to_leaf_components
@@ -12,6 +12,41 @@ _logger = logging.getLogger(__name__)
 class ProductTemplate(models.Model):
     _inherit = 'product.template'
 
+    x_monta_last_stock = fields.Float(
+        string="Monta Stock (last pull)",
+        readonly=True,
+        copy=False,
+        help="On-hand quantity reported by Monta's /stock list on the last stock pull."
+    )
+    x_monta_sold_out = fields.Boolean(
+        string="Sold Out on Monta",
+        readonly=True,
+        copy=False,
+        index=True,
+        help="Set by the Monta stock pull when the last Monta stock is zero or below."
+    )
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'default_code', 'seller_ids'}.intersection(vals):
+            self.env['monta.sku.index']._refresh_products(self.with_context(active_test=False).product_variant_ids)
+        return res
+
+    def _apply_soldout_policy(self):
+        """
+        Bulk sold-out pass over templates whose Monta stock just changed:
+        at most two writes (sold out / back in stock), only for templates whose flag flips.
+        """
+        to_flag = self.filtered(lambda t: t.x_monta_last_stock <= 0 and not t.x_monta_sold_out)
+        to_clear = self.filtered(lambda t: t.x_monta_last_stock > 0 and t.x_monta_sold_out)
+        if to_flag:
+            to_flag.write({'x_monta_sold_out': True})
+        if to_clear:
+            to_clear.write({'x_monta_sold_out': False})
+        if to_flag or to_clear:
+            _logger.info("[Monta Stock] Sold-out policy: %s sold out, %s back in stock", len(to_flag), len(to_clear))
+        return True
+
     def action_monta_log_pack_variant_skus(self, per_pack_qty=1.0, flatten=False):
         """
         For each variant:
@@ -9,7 +9,7 @@ class PurchaseOrder(models.Model):
 
     # Manual trigger (from button or shell)
     def action_monta_push_inbound_forecast(self):
-        svc = self.env['monta.inbound.forecast.service']
+        svc = self.env['monta.inbound.forecast.service'].with_context(monta_interactive=True)
         for po in self:
             try:
                 _logger.info("[Monta IF] Start push for PO %s", po.name)
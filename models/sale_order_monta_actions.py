@@ -85,6 +85,12 @@ class SaleOrder(models.Model):
         action_vals["context"] = ctx
         return action_vals
 
+    def _monta_interactive(self):
+        """Button clicks go ahead of cron traffic in the Monta rate limiter (not when a cron calls the button)."""
+        if self.env.context.get("cron_run"):
+            return self
+        return self.with_context(monta_interactive=True)
+
     # -----------------------------------------
     # Buttons wrapped with silence + single-note
     # -----------------------------------------
@@ -96,7 +102,7 @@ class SaleOrder(models.Model):
         with silence_monta_logs():
             try:
                 # Call the original implementation if defined upstream
-                res = super(SaleOrder, self).action_push_to_monta()
+                res = super(SaleOrder, self._monta_interactive()).action_push_to_monta()
                 # Success => clear flags
                 self._clear_block_note_flags()
                 return res
@@ -118,7 +124,7 @@ class SaleOrder(models.Model):
         self.ensure_one()
         with silence_monta_logs():
             try:
-                res = super(SaleOrder, self).action_monta_sync_status()
+                res = super(SaleOrder, self._monta_interactive()).action_monta_sync_status()
                 self._clear_block_note_flags()
                 return res
             except AttributeError:
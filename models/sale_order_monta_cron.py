@@ -12,9 +12,9 @@ class SaleOrder(models.Model):
 
     @api.model
     def _cron_monta_pull_status(self, limit=200):
-        """Cron: Pull Monta status for orders that already have a Monta reference."""
-        domain = [('monta_order_ref', '!=', False)]
-        orders = self.search(domain, limit=limit)
+        """Cron: Pull Monta status for orders that already have a Monta reference and are due a poll."""
+        domain = [('monta_order_ref', '!=', False)] + self._monta_due_domain()
+        orders = self.search(domain, limit=limit, order="monta_next_poll_at asc nulls first, id")
         pulled = 0
         for so in orders:
             try:
@@ -32,6 +32,12 @@ class SaleOrder(models.Model):
         _logger.info("Monta cron: pulled status for %s orders.", pulled)
         return True
 
+    @api.model
+    def _cron_monta_validate_delivered(self, limit=200):
+        """Cron: Validate pickings of orders Monta reported delivered (queued by the status sync)."""
+        self._monta_validate_delivered_pickings(limit=limit, commit=True)
+        return True
+
     @api.model
     def _cron_monta_push_pending(self, limit=200):
         """Cron: Push orders that are flagged as pending to Monta."""
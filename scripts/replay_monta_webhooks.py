@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Replay recorded Monta webhook payloads against an Odoo instance.
+
+    python scripts/replay_monta_webhooks.py http://localhost:8069 TOKEN payloads/*.json
+
+Each file holds one notification, a JSON list of notifications, or JSON lines.
+The payloads are POSTed to /monta/webhook as Monta would send them; run the
+"Monta: Apply Webhook Events" cron (or wait for it) to apply them.
+"""
+import argparse
+import json
+import sys
+
+import requests
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as fh:
+        text = fh.read().strip()
+    if not text:
+        return []
+    try:
+        data = json.loads(text)
+        return data if isinstance(data, list) else [data]
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("base_url", help="Odoo base URL, e.g. http://localhost:8069")
+    ap.add_argument("token", help="value of System Parameter monta.webhook_token")
+    ap.add_argument("files", nargs="+", help="recorded payload files")
+    ap.add_argument("--batch", action="store_true", help="send each file as one POST instead of one per payload")
+    args = ap.parse_args(argv)
+
+    url = args.base_url.rstrip("/") + "/monta/webhook"
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json", "X-Monta-Token": args.token})
+    sent = failed = 0
+    for path in args.files:
+        payloads = _load(path)
+        bodies = [payloads] if args.batch else payloads
+        for body in bodies:
+            resp = session.post(url, data=json.dumps(body), timeout=30)
+            if resp.status_code == 202:
+                sent += 1
+            else:
+                failed += 1
+                print(f"{path}: HTTP {resp.status_code} {resp.text[:200]}", file=sys.stderr)
+    print(f"posted {sent} request(s), {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Per-endpoint circuit breaker for Monta calls.
+
+After `threshold` consecutive failures (connection errors, timeouts, 5xx) on one endpoint
+("orders", "shipments", "product", ...) the circuit opens and calls fail immediately with
+MontaCircuitOpenError for `cooldown` seconds. Then one trial call is let through
+(half-open); its outcome closes or re-opens the circuit.
+
+Breakers live in the process (one per transport and endpoint). State changes are mirrored
+to monta_circuit_state with a short cursor of their own so they show up in the UI.
+"""
+import datetime
+import logging
+import threading
+import time
+
+import requests
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 5
+DEFAULT_COOLDOWN = 60.0   # seconds
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_MIRROR_SQL = """
+    INSERT INTO monta_circuit_state
+           (account_key, endpoint, state, failures, opened_at, open_until, last_error, create_date, write_date)
+    VALUES (%(key)s, %(endpoint)s, %(state)s, %(failures)s, %(opened_at)s, %(open_until)s, %(error)s,
+            now() at time zone 'UTC', now() at time zone 'UTC')
+    ON CONFLICT (account_key, endpoint) DO UPDATE
+       SET state = EXCLUDED.state,
+           failures = EXCLUDED.failures,
+           opened_at = EXCLUDED.opened_at,
+           open_until = EXCLUDED.open_until,
+           last_error = COALESCE(EXCLUDED.last_error, monta_circuit_state.last_error),
+           write_date = EXCLUDED.write_date
+"""
+
+
+class MontaCircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling Monta while the endpoint's circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, dbname, key, endpoint, threshold=DEFAULT_THRESHOLD, cooldown=DEFAULT_COOLDOWN):
+        self.dbname = dbname
+        self.key = key
+        self.endpoint = endpoint
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.open_until = 0.0
+        self.last_error = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def configure(self, threshold, cooldown):
+        self.threshold = max(1, int(threshold))
+        self.cooldown = max(1.0, float(cooldown))
+
+    def before(self):
+        """Raise MontaCircuitOpenError unless a call may go out now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.monotonic() >= self.open_until:
+                self.state, self._trial = HALF_OPEN, False
+            if self.state == HALF_OPEN and not self._trial:
+                self._trial = True
+                changed = True
+            else:
+                changed = False
+                left = max(0.0, self.open_until - time.monotonic())
+        if changed:
+            self._mirror()
+            return
+        raise MontaCircuitOpenError(
+            f"Monta endpoint '{self.endpoint}' is unavailable (circuit open, retry in {left:.0f}s): {self.last_error}")
+
+    def release(self):
+        """Give back a half-open trial that ended without a verdict (429, unexpected error)."""
+        with self._lock:
+            self._trial = False
+
+    def success(self):
+        with self._lock:
+            changed = self.state != CLOSED
+            self.state, self.failures, self._trial, self.opened_at = CLOSED, 0, False, None
+        if changed:
+            _logger.info("[Monta] Circuit for '%s' closed again", self.endpoint)
+            self._mirror()
+
+    def failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)[:500]
+            trip = self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.threshold)
+            if trip:
+                self.state, self._trial = OPEN, False
+                self.open_until = time.monotonic() + self.cooldown
+                self.opened_at = datetime.datetime.utcnow().replace(microsecond=0)
+        if trip:
+            _logger.warning("[Monta] Circuit for '%s' opened for %.0fs after %s failure(s): %s",
+                            self.endpoint, self.cooldown, self.failures, self.last_error)
+            self._mirror()
+
+    def _mirror(self):
+        open_until = None
+        if self.state != CLOSED:
+            open_until = datetime.datetime.utcnow().replace(microsecond=0) + datetime.timedelta(
+                seconds=max(0.0, self.open_until - time.monotonic()))
+        try:
+            from odoo.sql_db import db_connect
+            with db_connect(self.dbname).cursor() as cr:
+                cr.execute(_MIRROR_SQL, {
+                    "key": self.key, "endpoint": self.endpoint, "state": self.state,
+                    "failures": self.failures, "opened_at": self.opened_at,
+                    "open_until": open_until, "error": self.last_error,
+                })
+        except Exception as e:
+            _logger.debug("[Monta] Could not mirror circuit state for '%s': %s", self.endpoint, e)
@@ -2,6 +2,9 @@
 import logging, time, requests
 from requests.auth import HTTPBasicAuth
 
+from .monta_rate_limit import priority_from_env
+from .monta_transport import get_transport
+
 _logger = logging.getLogger(__name__)
 # DEFAULT_TIMEOUT = 5
 
@@ -32,9 +35,10 @@ class MontaClient:
         )
 
         try:
-            resp = requests.request(
-                method=method, url=url, headers=headers, json=payload,
-                auth=HTTPBasicAuth(user, pwd), timeout=timeout
+            resp = get_transport(self.env, base, user, pwd).request(
+                method, url, headers=headers, json=payload,
+                auth=HTTPBasicAuth(user, pwd), timeout=timeout,
+                priority=priority_from_env(self.env),
             )
             elapsed = time.time() - start
             try:
@@ -1,10 +1,13 @@
 #services/monta_http.py
 # -*- coding: utf-8 -*-
 import logging
-import requests
 from requests.auth import HTTPBasicAuth
 from odoo import models
 
+from .monta_rate_limit import priority_from_env
+from .monta_response_cache import response_cache_from_env
+from .monta_transport import get_transport
+
 _logger = logging.getLogger(__name__)
 
 class MontaHttp(models.AbstractModel):
@@ -27,11 +30,20 @@ class MontaHttp(models.AbstractModel):
         url = f"{base}/{path.lstrip('/')}"
         try:
             auth = HTTPBasicAuth(user, pwd) if (user and pwd) else None
-            resp = requests.get(url, params=params or {}, timeout=timeout, auth=auth, headers={
+            http = get_transport(self.env, base, user, pwd)
+            cache = response_cache_from_env(self.env)
+            if cache:
+                status, data = cache.get(http, url, params=params or {}, timeout=timeout, auth=auth,
+                                         headers={"Accept": "application/json"},
+                                         priority=priority_from_env(self.env))
+                if status >= 400:
+                    raise ValueError(f"HTTP {status}")
+                return data if data is not None else {}
+            resp = http.get(url, params=params or {}, timeout=timeout, auth=auth, headers={
                 "Accept": "application/json",
                 "Cache-Control": "no-cache",
                 "Pragma": "no-cache",
-            })
+            }, priority=priority_from_env(self.env))
             resp.raise_for_status()
             return resp.json() if resp.content else {}
         except Exception as e:
@@ -1,10 +1,13 @@
 
 # -*- coding: utf-8 -*-
-import json, pytz, requests, logging
+import json, pytz, logging
 from datetime import datetime, timedelta
 from requests.auth import HTTPBasicAuth
 from odoo import models, fields
 
+from .monta_rate_limit import priority_from_env
+from .monta_transport import get_transport
+
 _logger = logging.getLogger(__name__)
 
 class MontaInboundForecastService(models.AbstractModel):
@@ -80,7 +83,11 @@ class MontaInboundForecastService(models.AbstractModel):
             except Exception:
                 pass
 
-        r = requests.request(method=method, url=url, json=payload, auth=auth, headers=headers, timeout=timeout)
+        base, user, pwd, _tz, _wh = self._conf()
+        r = get_transport(self.env, base, user, pwd).request(
+            method, url, json=payload, auth=auth, headers=headers, timeout=timeout,
+            priority=priority_from_env(self.env),
+        )
         try:
             body = r.json()
         except Exception:
@@ -3,18 +3,26 @@
 import logging
 import math
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
-import requests
 from requests.auth import HTTPBasicAuth
 
 from odoo import _
 from odoo.tools import float_is_zero
 
+from .monta_rate_limit import priority_from_env
+from .monta_transport import get_transport, pool_size_from_env
+from ..utils.kit import max_packs, phantom_boms
+
 _logger = logging.getLogger(__name__)
 
 STOCK_PATH_SUFFIX = "/stock"  # GET /product/{sku}/stock
+DEFAULT_MAX_WORKERS = 8
+APPLY_CHUNK = 500  # quants per inventory apply (one savepoint each)
+DEFAULT_LIST_PATH = "/products"  # GET /products?page=N (Sku, MinimumStock, Stock.StockAvailable)
+MAX_LIST_PAGES = 1000
 
 
 @dataclass
@@ -55,6 +63,13 @@ class MontaQtySync:
             self.timeout = int(_param("monta.timeout", "monta.api.timeout", default="20"))
         except Exception:
             self.timeout = 20
+        try:
+            self.max_workers = max(1, int(_param("monta.qty_sync_max_workers", default=str(DEFAULT_MAX_WORKERS))))
+        except Exception:
+            self.max_workers = DEFAULT_MAX_WORKERS
+        self.bulk = _param("monta.qty_sync_bulk", default="1") != "0"
+        self.delta = _param("monta.stock_delta_sync", default="1") != "0"
+        self.list_path = _param("monta.qty_sync_list_path", default=DEFAULT_LIST_PATH)
 
         if not self.user or not self.pwd:
             _logger.warning(
@@ -67,6 +82,14 @@ class MontaQtySync:
                 self.base, self.channel, self.timeout
             )
 
+        # shared keep-alive pool for this account (one TLS handshake per connection, not per SKU)
+        # (pool at least as wide as the prefetch stage so workers never wait on a connection)
+        self.http = get_transport(
+            env, self.base, self.user, self.pwd,
+            pool_size=max(pool_size_from_env(env), self.max_workers),
+        )
+        self.priority = priority_from_env(env)
+
     # -------- HTTP --------
     def _get_product_stock(self, sku: str) -> Optional[MontaStock]:
         # Monta allows slashes if encoded as %2F; urllib.parse.quote handles this.
@@ -75,12 +98,13 @@ class MontaQtySync:
         params = {"channel": self.channel} if self.channel else {}
 
         try:
-            r = requests.get(
+            r = self.http.get(
                 url,
                 params=params,
                 auth=HTTPBasicAuth(self.user, self.pwd),
                 headers={"Accept": "application/json"},
                 timeout=self.timeout,
+                priority=self.priority,
             )
         except Exception as e:
             _logger.warning("Monta GET %s failed: %s", url, e)
@@ -99,6 +123,10 @@ class MontaQtySync:
             _logger.warning("Monta %s -> non-JSON body=%r", url, (r.text or "")[:200])
             return None
 
+        return self._parse_stock(data)
+
+    @staticmethod
+    def _parse_stock(data, require_both=False) -> Optional[MontaStock]:
         stock_available = None
         minimum_stock = None
         if isinstance(data, dict):
@@ -124,9 +152,78 @@ class MontaQtySync:
 
         if stock_available is None and minimum_stock is None:
             return None
+        if require_both and (stock_available is None or minimum_stock is None):
+            return None
 
         return MontaStock(float(stock_available or 0.0), float(minimum_stock or 0.0))
 
+    def _fetch_stock_list(self) -> Dict[str, MontaStock]:
+        """
+        Bulk mode: page through the product list endpoint (default /products?page=N) and
+        build MontaStock for every SKU that carries both StockAvailable and MinimumStock.
+        Returns {} when the endpoint is unusable so the caller falls back to per-SKU calls.
+        """
+        url = f"{self.base}/{self.list_path.lstrip('/')}"
+        out: Dict[str, MontaStock] = {}
+        seen = set()
+        for page in range(MAX_LIST_PAGES):
+            params = {"page": page}
+            if self.channel:
+                params["channel"] = self.channel
+            try:
+                r = self.http.get(
+                    url,
+                    params=params,
+                    auth=HTTPBasicAuth(self.user, self.pwd),
+                    headers={"Accept": "application/json"},
+                    timeout=self.timeout,
+                    priority=self.priority,
+                )
+            except Exception as e:
+                _logger.warning("Monta GET %s page=%s failed: %s", url, page, e)
+                break
+            if not r.ok:
+                _logger.warning("Monta %s page=%s -> HTTP %s body=%r", url, page, r.status_code, (r.text or "")[:200])
+                break
+            try:
+                data = r.json() or []
+            except Exception:
+                _logger.warning("Monta %s page=%s -> non-JSON body=%r", url, page, (r.text or "")[:200])
+                break
+
+            rows = data if isinstance(data, list) else (data.get("Items") or data.get("Products") or [])
+            new = 0
+            for row in rows:
+                if not isinstance(row, dict):
+                    continue
+                sku = str(row.get("Sku") or row.get("SKU") or row.get("ProductCode") or "").strip()
+                if not sku or sku in seen:
+                    continue
+                seen.add(sku)
+                new += 1
+                ms = self._parse_stock(row, require_both=True)
+                if ms:
+                    out[sku] = ms
+            # stop on an empty page, or when the tenant ignores ?page and repeats itself
+            if not rows or not new:
+                break
+
+        _logger.info("MontaQtySync: bulk list %s returned stock for %s SKUs", url, len(out))
+        return out
+
+    def _prefetch_stocks(self, skus: Iterable[str]) -> Dict[str, Optional[MontaStock]]:
+        """
+        Fetch /product/{sku}/stock for all SKUs with at most max_workers requests in flight.
+        Network only: workers never touch the ORM, the write phase stays single-threaded.
+        """
+        unique = list(dict.fromkeys(s for s in skus if s))
+        if not unique:
+            return {}
+        workers = min(self.max_workers, len(unique))
+        _logger.info("MontaQtySync: prefetching %s SKUs with %s workers", len(unique), workers)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="monta-qty") as pool:
+            return dict(zip(unique, pool.map(self._get_product_stock, unique)))
+
     # -------- Odoo helpers --------
     def _company_main_stock_location(self, company):
         StockLocation = self.env["stock.location"]
@@ -136,12 +233,16 @@ class MontaQtySync:
             limit=1,
         )
 
-    def _set_template_threshold(self, template, minimum: float):
+    def _set_template_threshold(self, template, minimum: float) -> bool:
+        """Returns False when the write failed (the caller then doesn't remember the SKU's values)."""
         try:
-            template.with_context(tracking_disable=True).write({"available_threshold": minimum})
+            with self.env.cr.savepoint():
+                template.with_context(tracking_disable=True).write({"available_threshold": minimum})
             _logger.info("Set available_threshold=%s on %s", minimum, template.display_name)
+            return True
         except Exception as e:
             _logger.warning("Failed to set available_threshold on %s: %s", template.display_name, e)
+            return False
 
     def _is_kit(self, product) -> bool:
         MrpBom = self.env["mrp.bom"]
@@ -150,34 +251,35 @@ class MontaQtySync:
             bom = MrpBom.search([("product_tmpl_id", "=", product.product_tmpl_id.id), ("product_id", "=", False)], limit=1)
         return bool(bom and bom.type == "phantom")
 
-    def _kit_max_packs_from_components(self, product, wh_location, monta_avail: float) -> Tuple[float, str]:
-        MrpBom = self.env["mrp.bom"]
-        Quant = self.env["stock.quant"]
-
-        bom = MrpBom.search([("product_id", "=", product.id)], limit=1)
-        if not bom:
-            bom = MrpBom.search([("product_tmpl_id", "=", product.product_tmpl_id.id), ("product_id", "=", False)], limit=1)
-        if not bom or bom.type != "phantom":
-            return 0.0, "no phantom BoM"
-
-        possible = math.inf
-        for line in bom.bom_line_ids:
-            comp = line.product_id
-            need = line.product_qty or 0.0
-            if float_is_zero(need, precision_rounding=comp.uom_id.rounding):
-                continue
-            quants = Quant.search([("product_id", "=", comp.id), ("location_id", "child_of", wh_location.id)])
-            onhand = sum(q.quantity for q in quants)
-            if need > 0:
-                possible = min(possible, onhand / need)
-
-        if math.isinf(possible):
-            possible = 0.0
-        # never promise more packs than Monta component availability suggests
-        capped = min(possible, max(0.0, monta_avail))
-        return max(0.0, float(capped)), f"components allow ~{int(max(0, math.floor(capped)))} pack(s)"
+    def _build_kit_index(self, products) -> Dict[int, List[Tuple[int, float]]]:
+        """
+        Kit index for a whole run: product.id -> [(component product.id, qty per pack)] for every
+        product whose BoM is phantom. Same BoM choice as _is_kit (variant BoM first, then the
+        template BoM), but from one mrp.bom search instead of up to two per product.
+        """
+        index = {
+            product_id: [
+                (line.product_id.id, line.product_qty or 0.0)
+                for line in bom.bom_line_ids
+                if not float_is_zero(line.product_qty or 0.0, precision_rounding=line.product_id.uom_id.rounding)
+            ]
+            for product_id, bom in phantom_boms(self.env, products).items()
+        }
+        _logger.info("MontaQtySync: kit index built (%s kits)", len(index))
+        return index
+
+    def _component_onhand(self, component_ids, wh_location) -> Dict[int, float]:
+        """On-hand per component under wh_location from a single stock.quant read_group."""
+        if not component_ids:
+            return {}
+        groups = self.env["stock.quant"].read_group(
+            [("product_id", "in", list(component_ids)), ("location_id", "child_of", wh_location.id)],
+            ["quantity:sum"], ["product_id"], lazy=False,
+        )
+        return {g["product_id"][0]: g["quantity"] or 0.0 for g in groups if g.get("product_id")}
 
     def _set_absolute_onhand(self, product, target_qty: float, wh_location) -> Optional[str]:
+        # Per-product path (stock.change.product.qty); run() goes through _apply_onhand_batch
         # Never adjust kits directly (phantom BoM / pack)
         if self._is_kit(product):
             return "is kit (phantom) – skip direct qty change"
@@ -218,8 +320,82 @@ class MontaQtySync:
             )
             return str(e)
 
+    def _apply_onhand_batch(self, targets, wh_location):
+        """
+        Batch variant of _set_absolute_onhand for non-kits.
+        targets: {product: target_qty}. Current on-hand comes from one read_group over stock.quant,
+        then the deltas are applied with one stock.quant inventory apply per chunk at wh_location.
+        A failing chunk is retried per product with the stock.change.product.qty wizard.
+        Returns {product.id: error} for products that could not be adjusted.
+        """
+        if not targets:
+            return {}
+        Quant = self.env["stock.quant"]
+        product_ids = [p.id for p in targets]
+        groups = Quant.read_group(
+            [("product_id", "in", product_ids), ("location_id", "child_of", wh_location.id)],
+            ["quantity:sum"], ["product_id"], lazy=False,
+        )
+        onhand = {g["product_id"][0]: g["quantity"] or 0.0 for g in groups if g.get("product_id")}
+
+        deltas = {}
+        for product, target in targets.items():
+            delta = target - onhand.get(product.id, 0.0)
+            if not float_is_zero(delta, precision_rounding=product.uom_id.rounding):
+                deltas[product] = delta
+        if not deltas:
+            return {}
+
+        existing = Quant.search([
+            ("product_id", "in", [p.id for p in deltas]),
+            ("location_id", "=", wh_location.id),
+            ("lot_id", "=", False),
+            ("package_id", "=", False),
+            ("owner_id", "=", False),
+        ])
+        quant_by_product = {}
+        for q in existing:
+            quant_by_product.setdefault(q.product_id.id, q)
+
+        errors = {}
+        products = list(deltas)
+        for i in range(0, len(products), APPLY_CHUNK):
+            chunk = products[i:i + APPLY_CHUNK]
+            try:
+                with self.env.cr.savepoint():
+                    InvQuant = Quant.with_context(inventory_mode=True)
+                    quants = Quant.browse()
+                    to_create = []
+                    for product in chunk:
+                        q = quant_by_product.get(product.id)
+                        if q:
+                            q.with_context(inventory_mode=True).inventory_quantity = q.quantity + deltas[product]
+                            quants |= q
+                        else:
+                            to_create.append({
+                                "product_id": product.id,
+                                "location_id": wh_location.id,
+                                "inventory_quantity": deltas[product],
+                            })
+                    if to_create:
+                        quants |= InvQuant.create(to_create)
+                    quants._apply_inventory()
+                _logger.info("Adjusted %s product(s) at %s in one inventory apply", len(chunk), wh_location.complete_name)
+            except Exception as e:
+                _logger.warning("Batch inventory apply failed at %s (%s); falling back to per-product wizard",
+                                wh_location.complete_name, e)
+                for product in chunk:
+                    try:
+                        with self.env.cr.savepoint():
+                            reason = self._set_absolute_onhand(product, targets[product], wh_location)
+                    except Exception as e2:
+                        reason = str(e2)
+                    if reason:
+                        errors[product.id] = reason
+        return errors
+
     # -------- main --------
-    def run(self, limit=None):
+    def run(self, limit=None, force=False):
         Product = self.env["product.product"]
         company = self.env.company
         wh_loc = self._company_main_stock_location(company)
@@ -237,29 +413,64 @@ class MontaQtySync:
         products = Product.search(domain, limit=limit)
         _logger.info("MontaQtySync: processing %s products", len(products))
 
-        for prod in products:
-            # packs may have no SKU: we use component SKUs via kit check; for non-kits use monta_sku/default_code
-            sku = (prod.monta_sku or prod.default_code or "").strip()
-            if not sku:
-                continue
+        # packs may have no SKU: we use component SKUs via kit check; for non-kits use monta_sku/default_code
+        sku_by_index = self.env["monta.sku.index"]._skus_for(products)
+        sku_by_product = {prod.id: (sku_by_index.get(prod.id) or "").strip() for prod in products}
+        stocks = self._fetch_stock_list() if self.bulk else {}
+        missing = [s for s in sku_by_product.values() if s and s not in stocks]
+        if stocks and missing:
+            _logger.info("MontaQtySync: %s SKUs not in bulk list; falling back to per-SKU calls", len(missing))
+        stocks.update(self._prefetch_stocks(missing))
+
+        # Delta: only re-write thresholds whose Monta values moved since the last applied run. On-hand
+        # targets always go to the batch apply: Odoo-side moves shift stock without Monta changing,
+        # and zero-delta products are dropped there after one read_group.
+        Fingerprint = self.env["monta.stock.fingerprint"].sudo()
+        values = {sku: (ms.available, ms.minimum) for sku, ms in stocks.items() if ms}
+        changed = set(values) if (force or not self.delta) else Fingerprint._changed("qty_sync", values)
+        if len(changed) < len(values):
+            _logger.info("MontaQtySync: %s of %s SKUs unchanged since last run; keeping their thresholds",
+                         len(values) - len(changed), len(values))
+        targets = {}
+        processed = set()
+        threshold_failed = set()
+
+        # Kits: one BoM search for the whole run (all kits, their packs depend on component moves too)
+        kit_index = self._build_kit_index(products.filtered(lambda p: stocks.get(sku_by_product[p.id])))
 
-            ms = self._get_product_stock(sku)
+        for prod in products:
+            sku = sku_by_product[prod.id]
+            ms = stocks.get(sku) if sku else None
             if not ms:
                 continue
-
-            # Always update website threshold from Monta MinimumStock
-            self._set_template_threshold(prod.product_tmpl_id, ms.minimum)
-
-            # Non-kits: set on-hand absolutely; Kits: compute feasibility only (no write)
-            reason = self._set_absolute_onhand(prod, ms.available, wh_loc)
-            if reason and ("kit" in reason or "phantom" in reason):
-                packs, desc = self._kit_max_packs_from_components(prod, wh_loc, ms.available)
-                _logger.info(
-                    "KIT [%s] %s: %s at %s (StockAvailable from Monta=%s, MinStock=%s)",
-                    prod.default_code or prod.display_name,
-                    prod.display_name,
-                    desc,
-                    wh_loc.complete_name,
-                    ms.available,
-                    ms.minimum,
-                )
+            processed.add(sku)
+
+            # Website threshold from Monta MinimumStock, when Monta's values moved
+            if sku in changed:
+                if not self._set_template_threshold(prod.product_tmpl_id, ms.minimum):
+                    threshold_failed.add(sku)
+
+            # Non-kits: collect the absolute on-hand target; Kits: never written directly
+            if prod.id not in kit_index and ms.available >= 0:
+                targets[prod] = ms.available
+
+        errors = self._apply_onhand_batch(targets, wh_loc)
+        failed_skus = {sku_by_product[pid] for pid in errors} | threshold_failed
+        Fingerprint._remember("qty_sync", {sku: values[sku] for sku in processed - failed_skus})
+
+        # Kit feasibility for every kit in one vectorized pass, on the freshly applied component stock
+        onhand = self._component_onhand({c for lines in kit_index.values() for c, _q in lines}, wh_loc)
+        caps = {pid: stocks[sku_by_product[pid]].available for pid in kit_index}
+        packs = max_packs(kit_index, onhand, caps)
+        kits = Product.browse(list(packs))
+        kits._monta_set_kit_available_packs(packs)
+        _logger.info("MontaQtySync: kit feasibility computed for %s kits", len(kits))
+        for prod in kits:
+            _logger.debug(
+                "KIT [%s] %s: components allow ~%s pack(s) at %s (StockAvailable from Monta=%s)",
+                prod.default_code or prod.display_name,
+                prod.display_name,
+                int(math.floor(packs[prod.id])),
+                wh_loc.complete_name,
+                caps[prod.id],
+            )
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Account-wide token bucket shared by every Odoo worker through Postgres.
+
+One row per Monta account in monta_rate_limit. Taking a token is one atomic UPDATE on a
+short-lived cursor of its own (never the caller's transaction, so no row lock outlives the
+statement and worker threads never share a cursor). Background (cron) traffic may only take
+a token while more than `reserve` tokens are left; interactive calls may use the reserve.
+A 429 blocks the bucket until its Retry-After has passed.
+"""
+import email.utils
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+DEFAULT_RATE = 10.0      # tokens per second
+DEFAULT_BURST = 20.0     # bucket size
+DEFAULT_RESERVE = 0.25   # share of the bucket only interactive calls may use
+MAX_WAIT = 120.0         # seconds a call waits for a token before going ahead anyway
+MAX_SLEEP = 5.0          # seconds per wait step
+MAX_BLOCK_SLEEP = 30.0   # local pause on 429 when the shared limiter is off
+
+_NOW = "(clock_timestamp() AT TIME ZONE 'UTC')"
+
+_ACQUIRE_SQL = f"""
+    UPDATE monta_rate_limit
+       SET tokens = LEAST(%(burst)s, tokens + EXTRACT(EPOCH FROM {_NOW} - updated_at) * %(rate)s) - 1,
+           updated_at = {_NOW}
+     WHERE account_key = %(key)s
+       AND (blocked_until IS NULL OR blocked_until <= {_NOW})
+       AND LEAST(%(burst)s, tokens + EXTRACT(EPOCH FROM {_NOW} - updated_at) * %(rate)s) >= %(need)s
+ RETURNING tokens
+"""
+
+_STATE_SQL = f"""
+    SELECT LEAST(%(burst)s, tokens + EXTRACT(EPOCH FROM {_NOW} - updated_at) * %(rate)s),
+           GREATEST(EXTRACT(EPOCH FROM blocked_until - {_NOW}), 0)
+      FROM monta_rate_limit WHERE account_key = %(key)s
+"""
+
+_ENSURE_SQL = f"""
+    INSERT INTO monta_rate_limit (account_key, tokens, updated_at, create_date, write_date)
+    VALUES (%(key)s, %(burst)s, {_NOW}, {_NOW}, {_NOW})
+    ON CONFLICT (account_key) DO NOTHING
+"""
+
+_BLOCK_SQL = f"""
+    UPDATE monta_rate_limit
+       SET tokens = 0,
+           updated_at = {_NOW},
+           blocked_until = GREATEST(COALESCE(blocked_until, {_NOW}), {_NOW} + %(secs)s * interval '1 second'),
+           throttled_count = COALESCE(throttled_count, 0) + 1
+     WHERE account_key = %(key)s
+"""
+
+
+def retry_after_seconds(resp, default=5.0):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    value = (resp.headers.get("Retry-After") or "").strip() if resp is not None else ""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+def priority_from_env(env):
+    """Button / UI calls set context monta_interactive; everything else is background traffic."""
+    return INTERACTIVE if env.context.get("monta_interactive") else BACKGROUND
+
+
+class MontaRateLimiter:
+    def __init__(self, dbname, key, rate=DEFAULT_RATE, burst=DEFAULT_BURST, reserve=DEFAULT_RESERVE):
+        self.dbname = dbname
+        self.key = key
+        self.configure(rate, burst, reserve)
+        self._ensured = False
+        self._broken = False
+
+    def configure(self, rate, burst, reserve):
+        self.rate = max(0.0, float(rate))
+        self.burst = max(1.0, float(burst))
+        self.reserve = min(max(0.0, float(reserve)), 0.9)
+
+    @property
+    def enabled(self):
+        return self.rate > 0 and not self._broken
+
+    def _run(self, sql, params, fetch=False):
+        from odoo.sql_db import db_connect
+        with db_connect(self.dbname).cursor() as cr:
+            if not self._ensured:
+                cr.execute(_ENSURE_SQL, params)
+                self._ensured = True
+            cr.execute(sql, params)
+            return cr.fetchone() if fetch else None
+
+    def acquire(self, priority=BACKGROUND):
+        """Take one token, waiting (up to MAX_WAIT) while the bucket is empty or blocked."""
+        if not self.enabled:
+            return
+        need = 1.0 if priority == INTERACTIVE else 1.0 + self.reserve * self.burst
+        params = {"key": self.key, "rate": self.rate, "burst": self.burst, "need": need}
+        deadline = time.monotonic() + MAX_WAIT
+        try:
+            while True:
+                if self._run(_ACQUIRE_SQL, params, fetch=True):
+                    return
+                tokens, blocked = self._run(_STATE_SQL, params, fetch=True) or (self.burst, 0.0)
+                wait = max(float(blocked or 0.0), (need - float(tokens or 0.0)) / self.rate, 0.01)
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    _logger.warning("[Monta] Rate limit wait exceeded %ss for %s traffic; sending anyway", MAX_WAIT, priority)
+                    return
+                time.sleep(min(wait, MAX_SLEEP, left))
+        except Exception as e:
+            # e.g. table not created yet during an upgrade: never block API calls on the limiter
+            self._broken = True
+            _logger.warning("[Monta] Rate limiter disabled for this process: %s", e)
+
+    def block(self, seconds):
+        """Monta answered 429: nobody in any worker sends for `seconds`."""
+        if not self.enabled:
+            time.sleep(min(seconds, MAX_BLOCK_SLEEP))
+            return
+        try:
+            self._run(_BLOCK_SQL, {"key": self.key, "secs": float(seconds), "burst": self.burst})
+        except Exception as e:
+            self._broken = True
+            _logger.warning("[Monta] Rate limiter disabled for this process: %s", e)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in response cache for Monta read endpoints, shared by every Odoo worker.
+
+Entries live in the UNLOGGED table monta_response_cache (created by
+monta.response.cache.stat.init(); unlogged = no WAL, emptied after a crash, which is fine
+for a cache). A fresh entry (younger than its endpoint TTL) is returned without calling
+Monta; a stale one is revalidated with If-None-Match / If-Modified-Since and a 304 renews
+it. Only 200 JSON responses are stored. Hits, revalidations and misses are counted per
+account and endpoint in monta_response_cache_stat.
+
+Like the rate limiter, every statement runs on a short-lived cursor of its own, never on
+the caller's transaction and never across the HTTP call.
+"""
+import hashlib
+import json
+import logging
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30          # seconds, endpoints not listed below
+DEFAULT_TTLS = {
+    "order": 30,
+    "orders": 30,
+    "shipments": 30,
+    "orderevents": 30,
+    "product": 300,
+    "products": 300,
+    "stock": 60,
+}
+MAX_BODY = 1024 * 1024    # bigger responses are passed through, not stored
+
+_NOW = "(clock_timestamp() AT TIME ZONE 'UTC')"
+
+_LOOKUP_SQL = f"""
+    SELECT status, body, etag, last_modified, expires_at > {_NOW}
+      FROM monta_response_cache WHERE cache_key = %(ckey)s
+"""
+
+_STORE_SQL = f"""
+    INSERT INTO monta_response_cache
+           (cache_key, account_key, endpoint, status, body, etag, last_modified, stored_at, expires_at)
+    VALUES (%(ckey)s, %(key)s, %(endpoint)s, %(status)s, %(body)s, %(etag)s, %(lm)s,
+            {_NOW}, {_NOW} + %(ttl)s * interval '1 second')
+    ON CONFLICT (cache_key) DO UPDATE
+       SET status = EXCLUDED.status, body = EXCLUDED.body, etag = EXCLUDED.etag,
+           last_modified = EXCLUDED.last_modified, stored_at = EXCLUDED.stored_at,
+           expires_at = EXCLUDED.expires_at
+"""
+
+_RENEW_SQL = f"""
+    UPDATE monta_response_cache
+       SET stored_at = {_NOW}, expires_at = {_NOW} + %(ttl)s * interval '1 second'
+     WHERE cache_key = %(ckey)s
+"""
+
+_COUNT_SQL = f"""
+    INSERT INTO monta_response_cache_stat
+           (account_key, endpoint, hits, revalidated, misses, create_date, write_date)
+    VALUES (%(key)s, %(endpoint)s, %(hits)s, %(revalidated)s, %(misses)s, {_NOW}, {_NOW})
+    ON CONFLICT (account_key, endpoint) DO UPDATE
+       SET hits = monta_response_cache_stat.hits + EXCLUDED.hits,
+           revalidated = monta_response_cache_stat.revalidated + EXCLUDED.revalidated,
+           misses = monta_response_cache_stat.misses + EXCLUDED.misses,
+           write_date = EXCLUDED.write_date
+"""
+
+
+class MontaResponseCache:
+    def __init__(self, dbname, ttls=None, default_ttl=DEFAULT_TTL):
+        self.dbname = dbname
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.disabled = False
+
+    def ttl(self, endpoint):
+        try:
+            return max(0, int(self.ttls.get(endpoint, self.default_ttl) or 0))
+        except (TypeError, ValueError):
+            return 0
+
+    # -------- SQL --------
+    def _execute(self, *statements):
+        """Run (sql, params) pairs on one short cursor; returns the last fetchone()."""
+        if self.disabled:
+            return None
+        try:
+            from odoo.sql_db import db_connect
+            row = None
+            with db_connect(self.dbname).cursor() as cr:
+                for sql, params in statements:
+                    cr.execute(sql, params)
+                    row = cr.fetchone() if cr.description else None
+            return row
+        except Exception as e:
+            _logger.warning("[Monta] Response cache unavailable, calling Monta directly: %s", e)
+            self.disabled = True
+            return None
+
+    @staticmethod
+    def _count(key, endpoint, hits=0, revalidated=0, misses=0):
+        return _COUNT_SQL, {"key": key, "endpoint": endpoint,
+                            "hits": hits, "revalidated": revalidated, "misses": misses}
+
+    # -------- API --------
+    def get(self, transport, url, params=None, headers=None, **kwargs):
+        """
+        GET through the cache: returns (status_code, decoded JSON or None), like an uncached
+        call would. kwargs (timeout, priority, auth, ...) go to transport.get().
+        """
+        endpoint = transport._endpoint(url)
+        ttl = self.ttl(endpoint)
+        if not ttl or self.disabled:
+            return self._decode(transport.get(url, params=params, headers=headers, **kwargs))
+
+        key = transport.key
+        ckey = hashlib.sha1(json.dumps([key, url, sorted((params or {}).items())],
+                                       default=str).encode()).hexdigest()
+        row = self._execute((_LOOKUP_SQL, {"ckey": ckey}))
+        if row and row[4]:
+            self._execute(self._count(key, endpoint, hits=1))
+            return row[0], json.loads(row[1])
+
+        headers = dict(headers or {})
+        if row and row[2]:
+            headers["If-None-Match"] = row[2]
+        if row and row[3]:
+            headers["If-Modified-Since"] = row[3]
+        resp = transport.get(url, params=params, headers=headers, **kwargs)
+
+        if resp.status_code == 304 and row:
+            self._execute((_RENEW_SQL, {"ckey": ckey, "ttl": ttl}),
+                          self._count(key, endpoint, revalidated=1))
+            return row[0], json.loads(row[1])
+
+        status, data = self._decode(resp)
+        statements = [self._count(key, endpoint, misses=1)]
+        if status == 200 and data is not None and len(resp.content) <= MAX_BODY:
+            statements.insert(0, (_STORE_SQL, {
+                "ckey": ckey, "key": key, "endpoint": endpoint, "status": status,
+                "body": json.dumps(data), "ttl": ttl,
+                "etag": resp.headers.get("ETag"), "lm": resp.headers.get("Last-Modified"),
+            }))
+        self._execute(*statements)
+        return status, data
+
+    @staticmethod
+    def _decode(resp):
+        try:
+            data = resp.json() if resp.content else None
+        except ValueError:
+            data = None
+        return resp.status_code, data
+
+
+def response_cache_from_env(env):
+    """
+    The cache configured in System Parameters, or None when it is off (monta.response_cache)
+    or the caller needs Monta's current answer (context monta_no_cache, e.g. after a webhook).
+    """
+    if env.context.get("monta_no_cache"):
+        return None
+    ICP = env["ir.config_parameter"].sudo()
+    if (ICP.get_param("monta.response_cache") or "0").strip() in ("", "0"):
+        return None
+    try:
+        ttls = json.loads(ICP.get_param("monta.response_cache_ttls") or "{}")
+        default_ttl = int(ICP.get_param("monta.response_cache_ttl") or DEFAULT_TTL)
+    except ValueError:
+        _logger.warning("[Monta] Invalid monta.response_cache_ttls / monta.response_cache_ttl, using defaults")
+        ttls, default_ttl = {}, DEFAULT_TTL
+    return MontaResponseCache(env.cr.dbname, ttls if isinstance(ttls, dict) else {}, default_ttl)
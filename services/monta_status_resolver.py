@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
 import json
 import time
-import requests
 from urllib.parse import urljoin
 import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from .monta_rate_limit import priority_from_env
+from .monta_response_cache import response_cache_from_env
+from .monta_transport import get_transport, pool_size_from_env
 
 _logger = logging.getLogger(__name__)
 
@@ -14,7 +19,7 @@ class MontaStatusResolver:
     Final override priority: Shipped/Delivered > Blocked > Backorder > (events/header).
     """
 
-    def __init__(self, env):
+    def __init__(self, env, pool_size=None):
         self.env = env
         ICP = env["ir.config_parameter"].sudo()
         self.base = (ICP.get_param("monta.base_url") or ICP.get_param("monta.api.base_url") or "").strip()
@@ -22,20 +27,33 @@ class MontaStatusResolver:
         self.pwd  = (ICP.get_param("monta.password") or "").strip()
         self.timeout = int(ICP.get_param("monta.timeout") or 20)
         self.allow_loose = (ICP.get_param("monta.match_loose") or "1").strip() != "0"
+        self.lazy = (ICP.get_param("monta.resolve_lazy") or "1").strip() != "0"
         if not (self.base and self.user and self.pwd):
             raise ValueError("Missing System Parameters: monta.base_url / monta.username / monta.password")
         if not self.base.endswith("/"):
             self.base += "/"
-        self.s = requests.Session()
-        self.s.auth = (self.user, self.pwd)
-        self.s.headers.update({"Accept":"application/json","Cache-Control":"no-cache","Pragma":"no-cache"})
+        # shared pooled session; headers go per request because the session is shared
+        self.s = get_transport(env, self.base, self.user, self.pwd, pool_size=pool_size)
+        self.priority = priority_from_env(env)
+        # opt-in shared response cache; without it every GET bypasses intermediate caches
+        self.cache = response_cache_from_env(env)
+        self.headers = {"Accept": "application/json"} if self.cache else \
+            {"Accept":"application/json","Cache-Control":"no-cache","Pragma":"no-cache"}
+        # endpoint capabilities of this Monta account, probed once and kept in System Parameters
+        self.caps = load_capabilities(env, self.s.key)
+        self.discovered = {}
 
     # ---------------- HTTP ----------------
     def _get(self, path, params=None):
         params = dict(params or {})
-        params["_ts"] = int(time.time())
         url = urljoin(self.base, path.lstrip("/"))
-        r = self.s.get(url, params=params, timeout=self.timeout)
+        if self.cache:
+            status, data = self.cache.get(self.s, url, params=params, headers=self.headers,
+                                          timeout=self.timeout, priority=self.priority)
+            _logger.debug("[Monta] GET %s params=%s -> %s (cache)", url, params, status)
+            return status, data
+        params["_ts"] = int(time.time())
+        r = self.s.get(url, params=params, headers=self.headers, timeout=self.timeout, priority=self.priority)
         try:
             data = r.json()
         except Exception:
@@ -43,6 +61,17 @@ class MontaStatusResolver:
         _logger.debug("[Monta] GET %s params=%s -> %s", url, params, r.status_code)
         return r.status_code, data
 
+    # ---------------- capabilities ----------------
+    def _learn(self, name, value):
+        """Remember a working endpoint/parameter; persisted by save_capabilities() on the main thread."""
+        if self.caps.get(name) != value:
+            self.caps[name] = value
+            self.discovered[name] = value
+
+    def save_capabilities(self):
+        save_capabilities(self.env, self.s.key, self.discovered)
+        self.discovered = {}
+
     # ---------------- helpers ----------------
     @staticmethod
     def _lower(s): return str(s or "").strip().lower()
@@ -157,43 +186,160 @@ class MontaStatusResolver:
         return False
 
     # ----------- order lookup -----------
-    def _find_order(self, order_ref, tried):
+    # query strategies, in the order they are tried; the name is persisted as match_strategy
+    FIND_STRATEGIES = [
+        ("orderNumber", "orderNumber"), ("reference", "reference"), ("clientReference", "clientReference"),
+        ("webshopOrderId", "webshopOrderId"), ("internalWebshopOrderId", "internalWebshopOrderId"),
+        ("eorderGuid", "eorderGuid"), ("search", "search"),
+    ]
+
+    def _find_by_id(self, monta_id, tried):
+        tried.append({"id": f"orders/{monta_id}"})
+        sc, full = self._get(f"orders/{monta_id}")
+        if 200 <= sc < 300 and isinstance(full, dict) and full:
+            return full
+        return None
+
+    def _find_order(self, order_ref, tried, hint=None):
+        """
+        Returns (order dict, strategy) or (None, None).
+        hint: {"id": Monta Id, "strategy": matched strategy} from a previous resolve;
+        the Id goes straight to orders/{Id}, the strategy is tried before the others.
+        """
+        hint = hint or {}
+        if hint.get("id"):
+            full = self._find_by_id(hint["id"], tried)
+            if full and self._score(order_ref, full)[0]:
+                return full, "id"
+            _logger.debug("[Monta] cached Monta Id %s no longer matches %s", hint["id"], order_ref)
+
+        # exact order/{ref} first; then the per-order query parameter, else the one this tenant
+        # answered to before; the loose "search" always stays last
+        params = dict(self.FIND_STRATEGIES)
+        learnable = [name for name in params if name != "search"]
+        preferred = next((s for s in (hint.get("strategy"), self.caps.get("find")) if s in learnable), None)
+        names = ["direct"] + sorted(params, key=lambda n: (n == "search", n != preferred, list(params).index(n)))
+
+        for name in names:
+            if name == "direct":
+                cand = self._find_direct(order_ref, tried)
+            else:
+                p = {params[name]: order_ref}
+                tried.append(p.copy())
+                sc, payload = self._get("orders", p)
+                if not (200 <= sc < 300): continue
+                cand = self._pick_best(order_ref, payload)
+                if cand:
+                    _logger.debug("[Monta] matched %s via %s", order_ref, p)
+            if cand:
+                # learn a query parameter once; direct is always tried first and search is too loose
+                if name in learnable and self.caps.get("find") not in learnable:
+                    self._learn("find", name)
+                return cand, name
+        _logger.info("[Monta] No order found for %s (tried=%s)", order_ref, tried)
+        return None, None
+
+    def _find_direct(self, order_ref, tried):
         tried.append({"direct": f"order/{order_ref}"})
         scd, direct = self._get(f"order/{order_ref}")
         if 200 <= scd < 300 and isinstance(direct, dict) and direct:
             items = self._as_list(direct)
             _logger.debug("[Monta] direct order hit for %s", order_ref)
             return items[0] if items and isinstance(items[0], dict) else direct
-
-        params_list = [
-            {"orderNumber": order_ref},{"reference": order_ref},{"clientReference": order_ref},
-            {"webshopOrderId": order_ref},{"internalWebshopOrderId": order_ref},{"eorderGuid": order_ref},{"search": order_ref}
-        ]
-        for p in params_list:
-            tried.append(p.copy())
-            sc, payload = self._get("orders", p)
-            if not (200 <= sc < 300): continue
-            cand = self._pick_best(order_ref, payload)
-            if cand:
-                _logger.debug("[Monta] matched %s via %s", order_ref, p)
-                return cand
-        _logger.info("[Monta] No order found for %s (tried=%s)", order_ref, tried)
         return None
 
+    # ----------- delta listings -----------
+    DELTA_PATHS = {"orders": "orders", "shipments": "shipments", "orderevents": "orderevents"}
+    DELTA_MAX_PAGES = 200
+
+    def _list_all(self, path, params):
+        """All rows of a paged listing (?page=N); stops on an empty, failed or repeated page."""
+        out, first = [], None
+        for page in range(self.DELTA_MAX_PAGES):
+            sc, payload = self._get(path, dict(params, page=page))
+            if not (200 <= sc < 300):
+                if not page:
+                    raise ValueError(f"Monta listing {path} failed with HTTP {sc}")
+                break
+            rows = [r for r in self._as_list(payload) if isinstance(r, dict)]
+            if not rows:
+                break
+            # tenants without paging return the same list for every page
+            key = json.dumps(rows[0], sort_keys=True, default=str)
+            if page and key == first:
+                break
+            if not page:
+                first = key
+            out += rows
+        return out
+
+    def changed_since(self, since):
+        """
+        Bulk pull of what changed in Monta since `since` (UTC datetime):
+        {"orders": [...], "shipments": [...], "orderevents": [...]}.
+        Listing paths / the since parameter are tenant specific:
+        ICP monta.delta_paths (JSON, same keys) and monta.delta_since_param (default "since").
+        """
+        ICP = self.env["ir.config_parameter"].sudo()
+        paths = dict(self.DELTA_PATHS)
+        try:
+            paths.update(json.loads(ICP.get_param("monta.delta_paths") or "{}"))
+        except ValueError:
+            _logger.warning("[Monta] Ignoring invalid monta.delta_paths")
+        since_param = (ICP.get_param("monta.delta_since_param") or "since").strip()
+        params = {since_param: since.strftime("%Y-%m-%dT%H:%M:%S")}
+        return {kind: self._list_all(path, params) for kind, path in paths.items()}
+
+    @staticmethod
+    def _ref_keys(rec):
+        """Lower-cased order references carried by an order / shipment / event row."""
+        keys = set()
+        for d in (rec, rec.get("Order") if isinstance(rec.get("Order"), dict) else None):
+            if not d:
+                continue
+            for f in ("OrderNumber","Reference","ClientReference","WebshopOrderId","InternalWebshopOrderId","EorderGUID","EorderGuid"):
+                v = MontaStatusResolver._lower(d.get(f))
+                if v:
+                    keys.add(v)
+        return keys
+
+    @staticmethod
+    def _ref_values(rec):
+        """Order references of a row as sent (stripped, original case), for indexed name lookups."""
+        values = set()
+        for d in (rec, rec.get("Order") if isinstance(rec.get("Order"), dict) else None):
+            if not d:
+                continue
+            for f in ("OrderNumber","Reference","ClientReference","WebshopOrderId","InternalWebshopOrderId","EorderGUID","EorderGuid"):
+                v = str(d.get(f) or "").strip()
+                if v:
+                    values.add(v)
+        return values
+
     # ---------------- resolve ----------------
-    def resolve(self, order_ref):
+    def resolve(self, order_ref, hint=None):
+        """hint: {"id", "strategy"} persisted on monta.order.status by a previous resolve."""
         tried = []
-        cand = self._find_order(order_ref, tried)
+        cand, strategy = self._find_order(order_ref, tried, hint=hint)
         if not cand:
             return None, {"reason": "Order not found or not matching searched reference", "tried": tried}
+        # orders/{Id} already returned the full order
+        status, meta = self.evaluate(order_ref, cand if strategy == "id" else self._hydrate(cand))
+        # keep the lookup that originally found the order when it came in through its Id
+        meta["match_strategy"] = (hint or {}).get("strategy") if strategy == "id" else strategy
+        return status, meta
 
-        # hydrate full order if possible
+    def _hydrate(self, cand):
+        """Replace a search hit by the full order if possible."""
         if cand.get("Id"):
             scid, full = self._get(f"orders/{cand['Id']}")
             if 200 <= scid < 300 and isinstance(full, dict) and full:
-                cand = full
+                return full
+        return cand
 
-        refs = {
+    @staticmethod
+    def _refs(order_ref, cand):
+        return {
             "orderId": cand.get("Id"),
             "orderNumber": cand.get("OrderNumber") or order_ref,
             "orderReference": cand.get("Reference") or order_ref,
@@ -202,64 +348,117 @@ class MontaStatusResolver:
             "webshopOrderId": cand.get("WebshopOrderId") or cand.get("InternalWebshopOrderId"),
         }
 
-        # ---- Shipments (freshest if available)
-        ship_status = ship_tt = ship_date = ship_msg = None
-        ship_src = None
-        for params, lbl in [
-            ({"orderId": refs["orderId"]}, "shipments"),
-            ({"orderNumber": refs["orderNumber"]}, "shipments"),
-            ({"orderReference": refs["orderReference"]}, "shipments"),
-            ({"clientReference": refs["clientReference"]}, "shipments"),
-            ({"orderGuid": refs["orderGuid"]}, "shipments"),
-            ({"webshopOrderId": refs["webshopOrderId"]}, "shipments"),
+    def _ship_status(self, ships):
+        """(status, track&trace, date, message) of the first shipment carrying a status, else None."""
+        for sh in self._as_list(ships):
+            st = (self._pick(sh,"DeliveryStatusDescription","ShipmentStatus","Status","CurrentStatus")
+                  or ("Shipped" if (sh.get("IsShipped") or sh.get("ShippedDate")) else None)
+                  or str(sh.get("ShipmentStatus") or ""))
+            if st:
+                return (st,
+                        self._pick(sh,"TrackAndTraceLink","TrackAndTraceUrl","TrackAndTrace","TrackingUrl"),
+                        self._pick(sh,"DeliveryDate","ShippedDate","EstimatedDeliveryTo","LatestDeliveryDate"),
+                        self._pick(sh,"BlockedMessage","DeliveryMessage","Message","Reason"))
+        return None
+
+    def _fetch_ship_status(self, order_ref, refs, by_id_only=False):
+        if by_id_only and refs.get("orderId"):
+            found = self._ship_status(self._get("shipments", {"orderId": refs["orderId"]})[1])
+            if found:
+                _logger.debug("[Monta] %s using shipment status '%s'", order_ref, found[0])
+            return found
+        for params in [
+            {"orderId": refs["orderId"]},
+            {"orderNumber": refs["orderNumber"]},
+            {"orderReference": refs["orderReference"]},
+            {"clientReference": refs["clientReference"]},
+            {"orderGuid": refs["orderGuid"]},
+            {"webshopOrderId": refs["webshopOrderId"]},
         ]:
             p = {k: v for k, v in params.items() if v}
             if not p: continue
             scS, ships = self._get("shipments", p)
-            for sh in self._as_list(ships):
-                st = (self._pick(sh,"DeliveryStatusDescription","ShipmentStatus","Status","CurrentStatus")
-                      or ("Shipped" if (sh.get("IsShipped") or sh.get("ShippedDate")) else None)
-                      or str(sh.get("ShipmentStatus") or ""))
-                if st:
-                    ship_status = st
-                    ship_tt = ship_tt or self._pick(sh,"TrackAndTraceLink","TrackAndTraceUrl","TrackAndTrace","TrackingUrl")
-                    ship_date = ship_date or self._pick(sh,"DeliveryDate","ShippedDate","EstimatedDeliveryTo","LatestDeliveryDate")
-                    ship_msg  = ship_msg  or self._pick(sh,"BlockedMessage","DeliveryMessage","Message","Reason")
-                    ship_src = lbl
+            found = self._ship_status(ships)
+            if found:
+                _logger.debug("[Monta] %s using shipment status '%s'", order_ref, found[0])
+                return found
+        return None
+
+    def _event_status(self, e):
+        """(status, message, track&trace, date) from one order event."""
+        return (
+            self._pick(e,"DeliveryStatusDescription","Status","CurrentStatus","ActionCode")
+            or self._pick(e.get("Order") or {}, "Status","CurrentStatus")
+            or self._pick(e.get("Shipment") or {}, "ShipmentStatus","Status","CurrentStatus"),
+            self._pick(e,"BlockedMessage","DeliveryMessage","Message","Reason"),
+            self._pick(e.get("Shipment") or {}, "TrackAndTraceLink","TrackAndTraceUrl","TrackAndTrace","TrackingUrl"),
+            self._pick(e.get("Shipment") or {}, "DeliveryDate","ShippedDate","EstimatedDeliveryTo","LatestDeliveryDate"),
+        )
+
+    def _fetch_event_status(self, order_ref, refs, by_id_only=False):
+        if by_id_only and refs.get("orderId"):
+            lst = self._as_list(self._get("orderevents", {"orderId": refs["orderId"], "limit": 1, "sort": "desc"})[1])
+            found = self._event_status(lst[0]) if lst else None
+            if found and found[0]:
+                _logger.debug("[Monta] %s using event status '%s'", order_ref, found[0])
+            return found
+        found = None
+        for params in [
+            {"orderId": refs["orderId"], "limit": 1, "sort": "desc"},
+            {"orderNumber": refs["orderNumber"], "limit": 1, "sort": "desc"},
+            {"orderReference": refs["orderReference"], "limit": 1, "sort": "desc"},
+            {"clientReference": refs["clientReference"], "limit": 1, "sort": "desc"},
+            {"orderGuid": refs["orderGuid"], "limit": 1, "sort": "desc"},
+            {"webshopOrderId": refs["webshopOrderId"], "limit": 1, "sort": "desc"},
+        ]:
+            p = {k: v for k, v in params.items() if v}
+            scE, ev = self._get("orderevents", p)
+            lst = self._as_list(ev)
+            if lst:
+                found = self._event_status(lst[0])
+                if found[0]:
+                    _logger.debug("[Monta] %s using event status '%s'", order_ref, found[0])
                     break
-            if ship_status:
-                _logger.debug("[Monta] %s using shipment status '%s'", order_ref, ship_status)
-                break
+        return found
 
-        # ---- Order events (if no shipment status)
-        event_status = event_msg = event_tt = event_date = None
-        event_src = None
-        if not ship_status:
-            for params, lbl in [
-                ({"orderId": refs["orderId"], "limit": 1, "sort": "desc"}, "orderevents"),
-                ({"orderNumber": refs["orderNumber"], "limit": 1, "sort": "desc"}, "orderevents"),
-                ({"orderReference": refs["orderReference"], "limit": 1, "sort": "desc"}, "orderevents"),
-                ({"clientReference": refs["clientReference"], "limit": 1, "sort": "desc"}, "orderevents"),
-                ({"orderGuid": refs["orderGuid"], "limit": 1, "sort": "desc"}, "orderevents"),
-                ({"webshopOrderId": refs["webshopOrderId"], "limit": 1, "sort": "desc"}, "orderevents"),
-            ]:
-                p = {k: v for k, v in params.items() if v}
-                scE, ev = self._get("orderevents", p)
-                lst = self._as_list(ev)
+    COLLIES_ENDPOINTS = ("orders/{oid}/collies", "ordercollies?OrderId={oid}", "collies?OrderId={oid}")
+
+    def _collies_track_trace(self, order_ref, oid, track_trace, status_txt):
+        """Try to improve T&T via the Collies endpoints; returns (track_trace, status_txt)."""
+        known = self.caps.get("collies")
+        endpoints = [known] if known in self.COLLIES_ENDPOINTS else list(self.COLLIES_ENDPOINTS)
+        try:
+            for tpl in endpoints:
+                scC, col = self._get(tpl.format(oid=oid))
+                if tpl == known and scC not in (404,) and not (200 <= scC < 300):
+                    # the remembered endpoint stopped working: forget it and probe again next time
+                    _logger.info("[Monta] Collies endpoint %s answered %s; re-probing", tpl, scC)
+                    self.caps.pop("collies", None)
+                    self.discovered["collies"] = None
+                lst = self._as_list(col) if 200 <= scC < 300 else []
                 if lst:
-                    e = lst[0]
-                    event_status = (
-                        self._pick(e,"DeliveryStatusDescription","Status","CurrentStatus","ActionCode")
-                        or self._pick(e.get("Order") or {}, "Status","CurrentStatus")
-                        or self._pick(e.get("Shipment") or {}, "ShipmentStatus","Status","CurrentStatus")
-                    )
-                    event_msg  = self._pick(e,"BlockedMessage","DeliveryMessage","Message","Reason")
-                    event_tt   = self._pick(e.get("Shipment") or {}, "TrackAndTraceLink","TrackAndTraceUrl","TrackAndTrace","TrackingUrl")
-                    event_date = self._pick(e.get("Shipment") or {}, "DeliveryDate","ShippedDate","EstimatedDeliveryTo","LatestDeliveryDate")
-                    event_src  = lbl
-                    if event_status:
-                        _logger.debug("[Monta] %s using event status '%s'", order_ref, event_status)
-                        break
+                    self._learn("collies", tpl)
+                    # Pick the first shipped colli with a link
+                    for c in lst:
+                        url = self._pick(c, "TrackAndTraceLink","TrackAndTraceUrl","TrackingUrl")
+                        code = self._pick(c, "TrackAndTraceCode","TrackingCode","ColliNumber")
+                        if url or code:
+                            track_trace = url or track_trace
+                            # enrich status text if missing tt
+                            if (not url) and code and status_txt and "T&T" not in status_txt:
+                                status_txt += f" (T&T: {code})"
+                            return track_trace, status_txt
+        except Exception:
+            _logger.debug("[Monta] Collies lookup failed for %s", order_ref)
+        return track_trace, status_txt
+
+    def evaluate(self, order_ref, cand, shipments=None, events=None):
+        """
+        Status decision for one (hydrated) order header.
+        shipments / events: already-fetched lists (events newest first) to use instead of
+        querying Monta, e.g. from a delta listing; None means fetch them here.
+        """
+        refs = self._refs(order_ref, cand)
 
         # ---- Order header (compute both flag-based + text-based)
         header_flag = self._status_from_flags(cand)
@@ -269,7 +468,37 @@ class MontaStatusResolver:
         header_date = self._pick(cand,"DeliveryDate","ShippedDate","EstimatedDeliveryTo","LatestDeliveryDate")
         header_msg  = self._pick(cand,"BlockedMessage","DeliveryMessage","Message","Reason")
 
-        
+        # ---- HEADER FLAGS
+        header_blocked = self._is_blocked_header(cand)
+        header_backord = self._is_backorder_header(cand)
+
+        # ---- Lazy: a Delivered header decides alone; Blocked / Backorder only lose to a shipped or
+        # delivered shipment / latest event, so for those one orderId query per resource is enough
+        header_final = self.lazy and "delivered" in self._lower(header_status)
+        header_held = self.lazy and not header_final and (header_blocked or header_backord)
+
+        # ---- Shipments (freshest if available)
+        if header_final:
+            ship = None
+        elif shipments is None:
+            ship = self._fetch_ship_status(order_ref, refs, by_id_only=header_held)
+        else:
+            ship = self._ship_status(shipments)
+        ship_status, ship_tt, ship_date, ship_msg = ship or (None, None, None, None)
+        ship_src = "shipments" if ship_status else None
+
+        # ---- Order events (if no shipment status)
+        event_status = event_msg = event_tt = event_date = None
+        event_src = None
+        if not ship_status and not header_final:
+            if events is None:
+                ev = self._fetch_event_status(order_ref, refs, by_id_only=header_held)
+            else:
+                ev = self._event_status(events[0]) if events else None
+            if ev:
+                event_status, event_msg, event_tt, event_date = ev
+                event_src = "orderevents"
+
         # ---- Choose freshest first
         src         = ship_src or event_src or "orders"
         status_txt  = ship_status or event_status or header_status
@@ -277,10 +506,6 @@ class MontaStatusResolver:
         dd          = ship_date or event_date or header_date
         dm          = ship_msg or event_msg or header_msg
 
-        # ---- HEADER FLAGS
-        header_blocked = self._is_blocked_header(cand)
-        header_backord = self._is_backorder_header(cand)
-
         # ---- SHIPPED/DELIVERED WINS
         is_shipped_or_delivered = False
         if status_txt:
@@ -300,31 +525,12 @@ class MontaStatusResolver:
         if not status_txt:
             status_txt = "Received / Pending workflow"
 
-        # Compose track&trace preferred link
+        # Compose track&trace preferred link (improved via Collies when we have an orderId).
+        # Lazy: collies only exist once something shipped, and aren't needed when a link is known.
         track_trace = tt
-
-        # Try to improve T&T via Collies endpoint when we have an orderId
-        try:
-            oid = refs.get("orderId")
-            if oid:
-                for p in (f"orders/{oid}/collies", f"ordercollies?OrderId={oid}", f"collies?OrderId={oid}"):
-                    scC, col = self._get(p)
-                    lst = self._as_list(col)
-                    if lst:
-                        # Pick the first shipped colli with a link
-                        for c in lst:
-                            url = self._pick(c, "TrackAndTraceLink","TrackAndTraceUrl","TrackingUrl")
-                            code = self._pick(c, "TrackAndTraceCode","TrackingCode","ColliNumber")
-                            if url or code:
-                                track_trace = url or track_trace
-                                # enrich status text if missing tt
-                                if (not url) and code and status_txt and "T&T" not in status_txt:
-                                    status_txt += f" (T&T: {code})"
-                                raise StopIteration
-        except StopIteration:
-            pass
-        except Exception:
-            _logger.debug("[Monta] Collies lookup failed for %s", order_ref)
+        shipped = bool(ship_status) or bool(cand.get("IsShipped") or cand.get("ShippedDate"))
+        if refs.get("orderId") and (not self.lazy or (shipped and not track_trace)):
+            track_trace, status_txt = self._collies_track_trace(order_ref, refs["orderId"], track_trace, status_txt)
 
         meta = {
             "source": src,
@@ -332,6 +538,7 @@ class MontaStatusResolver:
             "delivery_date": dd,
             "delivery_message": dm,
             "monta_order_ref": refs.get("orderNumber") or refs.get("orderReference"),
+            "monta_order_id": refs.get("orderId"),
             "refs": refs,
             "status_raw": json.dumps({
                 "order": cand,
@@ -340,6 +547,8 @@ class MontaStatusResolver:
                 "event_status": event_status,
                 "header_blocked": header_blocked,
                 "header_backorder": header_backord,
+                "header_final": header_final,
+                "header_held": header_held,
                 "final_status": status_txt,
                 "resolution_notes": "Shipped/Delivered overrides backorder; blocked/backorder only apply if not shipped."
             }, ensure_ascii=False),
@@ -348,3 +557,72 @@ class MontaStatusResolver:
         _logger.info("[Monta] FINAL RESOLUTION %s -> %s (blocked=%s, backorder=%s, src=%s)",
                      order_ref, status_txt, header_blocked, header_backord, src)
         return status_txt, meta
+
+
+def _capabilities_key(account):
+    return f"monta.capabilities.{account}"
+
+
+def load_capabilities(env, account):
+    """{"find": strategy, "collies": endpoint template} known to work for this account."""
+    raw = env["ir.config_parameter"].sudo().get_param(_capabilities_key(account))
+    try:
+        caps = json.loads(raw) if raw else {}
+    except ValueError:
+        caps = {}
+    return caps if isinstance(caps, dict) else {}
+
+
+def save_capabilities(env, account, discovered):
+    """Merge newly discovered capabilities (None = forget) into System Parameters; ORM, main thread only."""
+    if not discovered:
+        return
+    caps = load_capabilities(env, account)
+    for name, value in discovered.items():
+        if value is None:
+            caps.pop(name, None)
+        else:
+            caps[name] = value
+    env["ir.config_parameter"].sudo().set_param(_capabilities_key(account), json.dumps(caps, sort_keys=True))
+    _logger.info("[Monta] Capabilities for account %s: %s", account[:8], caps)
+
+
+def resolve_parallel(env, refs, max_workers=8, hints=None):
+    """
+    Fetch phase of a status sync: resolve many order references concurrently.
+    Resolvers are built here on the calling thread (they read System Parameters); workers
+    only do HTTP, each borrowing its own resolver, and never touch the ORM.
+    hints: {ref: {"id", "strategy"}} read from monta.order.status by the caller.
+    Returns {ref: (status, meta)} or {ref: exception} for references that raised.
+    """
+    hints = hints or {}
+    refs = list(dict.fromkeys(r for r in refs if r))
+    if not refs:
+        return {}
+    workers = max(1, min(max_workers, len(refs)))
+    pool_size = max(pool_size_from_env(env), workers)
+    idle = queue.Queue()
+    resolvers = [MontaStatusResolver(env, pool_size=pool_size) for _ in range(workers)]
+    for resolver in resolvers:
+        idle.put(resolver)
+
+    def _one(ref):
+        resolver = idle.get()
+        try:
+            return resolver.resolve(ref, hint=hints.get(ref))
+        except Exception as e:
+            return e
+        finally:
+            idle.put(resolver)
+
+    if workers == 1:
+        results = {ref: _one(ref) for ref in refs}
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="monta-status") as pool:
+            results = dict(zip(refs, pool.map(_one, refs)))
+
+    discovered = {}
+    for resolver in resolvers:
+        discovered.update(resolver.discovered)
+    save_capabilities(env, resolvers[0].s.key, discovered)
+    return results
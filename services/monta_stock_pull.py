@@ -1,13 +1,30 @@
 # -*- coding: utf-8 -*-
+import io
 import logging
-from .monta_client import MontaClient
+
+from .monta_rate_limit import priority_from_env
+from .monta_transport import get_transport
+
+try:
+    import ijson
+except ImportError:  # optional: without it each page is decoded with resp.json()
+    ijson = None
+
 _logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 500     # SKUs applied per chunk (one savepoint / commit each)
+MAX_PAGES = 1000
+
+_warned_no_ijson = False
+
+
 class MontaStockPull:
     """
     Pull current stock per SKU from Monta and mirror it into Odoo:
       - Writes x_monta_last_stock on product.template
       - Applies min-stock/sold-out policy
+    The /stock list is paged (?page=N) and Items are decoded incrementally, so only
+    one chunk of SKUs is held in memory; each chunk is applied on its own.
     """
     def __init__(self, env):
         self.env = env
@@ -16,42 +33,129 @@ class MontaStockPull:
         # Adjust for your tenant, e.g. /stock?channel=X or /inventory
         return "/stock"
 
-    def pull_and_apply(self, limit=None):
-        Product = self.env['product.product']
+    # -------- HTTP / streaming --------
+    @staticmethod
+    def _iter_items(resp):
+        """Yield the rows of one page: a top-level JSON list or {"Items": [...]}"""
+        global _warned_no_ijson
+        if ijson is None:
+            if not _warned_no_ijson:
+                _warned_no_ijson = True
+                _logger.warning("[Monta Stock] ijson is not installed; decoding each /stock page in full "
+                                "(pip install ijson for streaming)")
+            body = resp.json() if resp.content else []
+            rows = body if isinstance(body, list) else (body or {}).get('Items') or []
+            yield from rows
+            return
+        resp.raw.decode_content = True
+        stream = io.BufferedReader(resp.raw)
+        first = stream.peek(64).lstrip()[:1]
+        prefix = 'item' if first == b'[' else 'Items.item'
+        yield from ijson.items(stream, prefix, use_float=True)
+
+    def _iter_rows(self):
+        """Yield (sku, qty) over all pages; stops on an empty or repeated page."""
+        base, user, pwd, timeout = self.env['monta.http']._conf()
+        base = base or 'https://api-v6.monta.nl'
+        url = f"{base}/{self._endpoint().lstrip('/')}"
+        http = get_transport(self.env, base, user, pwd)
+
+        page0_first = None
+        for page in range(MAX_PAGES):
+            resp = http.get(url, params={'page': page}, timeout=timeout, stream=True,
+                            headers={'Accept': 'application/json'}, priority=priority_from_env(self.env))
+            with resp:
+                if not resp.ok:
+                    _logger.error("[Monta Stock] GET %s page=%s failed: %s %s",
+                                  url, page, resp.status_code, (resp.text or '')[:200])
+                    return
+                rows = 0
+                for r in self._iter_items(resp):
+                    if not isinstance(r, dict):
+                        continue
+                    rows += 1
+                    sku = r.get('Sku') or r.get('SKU') or r.get('ProductCode')
+                    qty = r.get('OnHand') or r.get('Available') or r.get('Quantity')
+                    if rows == 1:
+                        # tenants without paging return the full list again for every page
+                        if page and sku == page0_first:
+                            return
+                        if not page:
+                            page0_first = sku
+                    if sku is None or qty is None:
+                        continue
+                    yield str(sku), float(qty)
+            if not rows:
+                return
+
+    # -------- apply --------
+    def _apply_chunk(self, sku_to_qty, force=False):
         Tmpl = self.env['product.template']
-        client = MontaClient(self.env)
-        proxy_order = self.env['sale.order'].browse()
 
-        status, body = client.request(proxy_order, "GET", self._endpoint(), payload=None)
-        if not (200 <= (status or 0) < 300):
-            _logger.error("[Monta Stock] GET failed: %s %s", status, body)
+        # Delta: drop SKUs whose quantity hasn't moved since the last applied pull
+        Fingerprint = self.env['monta.stock.fingerprint'].sudo()
+        delta = (self.env['ir.config_parameter'].sudo().get_param('monta.stock_delta_sync') or '1') != '0'
+        if delta and not force:
+            changed = Fingerprint._changed('stock_pull', {s: (q,) for s, q in sku_to_qty.items()})
+            sku_to_qty = {s: q for s, q in sku_to_qty.items() if s in changed}
+        if not sku_to_qty:
             return 0
 
-        # Expecting body like: [{"Sku":"ABC","OnHand":12}, ...]
-        rows = body if isinstance(body, list) else body.get('Items') or []
-        updated = 0
-        sku_to_qty = {}
-        for r in rows:
-            sku = r.get('Sku') or r.get('SKU') or r.get('ProductCode')
-            qty = r.get('OnHand') or r.get('Available') or r.get('Quantity')
-            if sku is None or qty is None:
-                continue
-            sku_to_qty[str(sku)] = float(qty)
-
-        # Map SKUs to templates
-        prods = Product.search([('|', ('monta_sku', 'in', list(sku_to_qty.keys())),
-                                     ('default_code', 'in', list(sku_to_qty.keys())))])
-        by_tmpl = {}
-        for p in prods:
-            qty = sku_to_qty.get(p.monta_sku or p.default_code)
-            if qty is None:
-                continue
-            t = p.product_tmpl_id
-            t.write({'x_monta_last_stock': qty})
-            by_tmpl.setdefault(t.id, t)
-            updated += 1
-
-        # Apply policies
-        Tmpl.browse(list(by_tmpl.keys()))._apply_soldout_policy()
-        _logger.info("[Monta Stock] Updated %s product templates.", updated)
-        return updated
\ No newline at end of file
+        # Map SKUs to templates (indexed effective-SKU lookup)
+        prod_by_sku = self.env['monta.sku.index']._resolve_many(list(sku_to_qty.keys()))
+        qty_by_tmpl = {}
+        applied = {}
+        for sku, p in prod_by_sku.items():
+            qty = sku_to_qty[sku]
+            applied[sku] = (qty,)
+            qty_by_tmpl[p.product_tmpl_id.id] = qty
+
+        # One write per distinct quantity, only for templates whose value actually changed
+        tmpls = Tmpl.browse(list(qty_by_tmpl))
+        groups = {}
+        for t in tmpls:
+            if t.x_monta_last_stock != qty_by_tmpl[t.id]:
+                groups.setdefault(qty_by_tmpl[t.id], []).append(t.id)
+        changed_ids = []
+        for qty, ids in groups.items():
+            Tmpl.browse(ids).write({'x_monta_last_stock': qty})
+            changed_ids += ids
+
+        # Apply policies to every matched template, not only the rewritten ones: a first reported stock
+        # of 0 equals the field default and is never written. The policy only writes flags that flip.
+        tmpls._apply_soldout_policy()
+        Fingerprint._remember('stock_pull', applied)
+        return len(changed_ids)
+
+    def pull_and_apply(self, limit=None, force=False, commit=False):
+        """
+        commit=True (cron) commits after every chunk so a mid-run failure keeps earlier chunks.
+        limit caps the number of SKUs read from Monta.
+        """
+        updated = seen = 0
+        chunk = {}
+
+        def flush():
+            nonlocal updated
+            with self.env.cr.savepoint():
+                updated += self._apply_chunk(chunk, force=force)
+            if commit:
+                self.env.cr.commit()
+            chunk.clear()
+
+        try:
+            for sku, qty in self._iter_rows():
+                chunk[sku] = qty
+                seen += 1
+                if len(chunk) >= CHUNK_SIZE:
+                    flush()
+                if limit and seen >= limit:
+                    break
+            if chunk:
+                flush()
+        except Exception as e:
+            _logger.exception("[Monta Stock] Pull aborted after %s SKUs (%s applied): %s", seen, updated, e)
+            return updated
+
+        _logger.info("[Monta Stock] Read %s SKUs, updated %s product templates.", seen, updated)
+        return updated
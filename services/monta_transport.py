@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .monta_circuit import DEFAULT_COOLDOWN, DEFAULT_THRESHOLD, CircuitBreaker, MontaCircuitOpenError  # noqa: F401
+from .monta_rate_limit import (
+    BACKGROUND, DEFAULT_BURST, DEFAULT_RATE, DEFAULT_RESERVE, MAX_BLOCK_SLEEP, MontaRateLimiter,
+    retry_after_seconds,
+)
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+MAX_THROTTLE_RETRIES = 3   # re-sends after a 429 (the request was not processed)
+DEFAULT_RETRIES = 2        # extra attempts for idempotent requests on network errors / 502-504
+BACKOFF_BASE = 0.5         # seconds; attempt n sleeps uniform(0, BACKOFF_BASE * 2**n) ("full jitter")
+BACKOFF_MAX = 8.0
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {502, 503, 504}
+
+_LOCK = threading.Lock()
+_TRANSPORTS = {}
+
+
+def account_key(base: str, user: str) -> str:
+    """Stable per-account key (same hashing as monta.order.status.monta_account_key)."""
+    b = (base or "").strip().lower().rstrip("/")
+    u = (user or "").strip().lower()
+    return hashlib.sha1(f"{b}|{u}".encode("utf-8")).hexdigest()
+
+
+class MontaTransport:
+    """
+    Process-wide pooled HTTP transport for one Monta account:
+      • One requests.Session per (base URL, user, password) with keep-alive
+      • Connection pool sized via ICP monta.http_pool_size (default 10)
+      • Safe to share between threads (the session is never mutated after creation;
+        per-call headers/params/auth go through request())
+    """
+
+    def __init__(self, base, user, pwd, pool_size=DEFAULT_POOL_SIZE):
+        self.base = (base or "").rstrip("/")
+        self.user = user or ""
+        self.key = account_key(base, user)
+        self.pool_size = max(1, int(pool_size or DEFAULT_POOL_SIZE))
+
+        s = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        if user and pwd:
+            s.auth = (user, pwd)
+        self.session = s
+        self.limiter = None
+        self.dbname = None
+        self.retries = DEFAULT_RETRIES
+        self.breaker_conf = (DEFAULT_THRESHOLD, DEFAULT_COOLDOWN)
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+
+    # -------- circuit breakers --------
+    def _endpoint(self, url):
+        """First path segment below the base URL: 'orders', 'order', 'shipments', 'product', ..."""
+        base_path = urlparse(self.base).path.rstrip("/")
+        path = urlparse(url).path
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+        return (path.strip("/").split("/") or [""])[0] or "/"
+
+    def breaker(self, endpoint):
+        with self._breakers_lock:
+            br = self._breakers.get(endpoint)
+            if br is None:
+                br = self._breakers[endpoint] = CircuitBreaker(self.dbname, self.key, endpoint)
+            br.configure(*self.breaker_conf)
+            return br
+
+    @staticmethod
+    def _backoff(attempt):
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def request(self, method, url, priority=BACKGROUND, **kwargs):
+        """
+        Send through the endpoint's circuit breaker and the account rate limiter
+        (priority: rate_limit.INTERACTIVE / BACKGROUND).
+          • circuit open -> MontaCircuitOpenError right away (a requests ConnectionError)
+          • 429 -> the account pauses for Retry-After in every worker, then the request is re-sent
+          • network error / 502-504 on an idempotent method -> retried with jittered backoff
+        """
+        breaker = self.breaker(self._endpoint(url))
+        retries = self.retries if method.upper() in IDEMPOTENT_METHODS else 0
+        attempt = throttled = 0
+        # `settled` is False while a call admitted by before() has no verdict yet; the finally
+        # clause gives an unsettled half-open trial back so the circuit can't stay stuck
+        breaker.before()
+        settled = False
+        try:
+            while True:
+                if self.limiter:
+                    self.limiter.acquire(priority)
+                try:
+                    resp = self.session.request(method=method, url=url, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    breaker.failure(e)
+                    settled = True
+                    if attempt >= retries:
+                        raise
+                    attempt += 1
+                    _logger.info("[Monta] %s %s failed (%s); retry %s/%s", method, url, e, attempt, retries)
+                    time.sleep(self._backoff(attempt))
+                    breaker.before()
+                    settled = False
+                    continue
+
+                if resp.status_code == 429:
+                    if throttled >= MAX_THROTTLE_RETRIES:
+                        return resp
+                    # throttled, not broken: re-sent under the same admission
+                    throttled += 1
+                    wait = retry_after_seconds(resp)
+                    _logger.warning("[Monta] 429 on %s %s; pausing the account for %.1fs (retry %s/%s)",
+                                    method, url, wait, throttled, MAX_THROTTLE_RETRIES)
+                    resp.close()
+                    if self.limiter:
+                        self.limiter.block(wait)
+                    else:
+                        time.sleep(min(wait, MAX_BLOCK_SLEEP))
+                    continue
+
+                if resp.status_code >= 500:
+                    breaker.failure(f"HTTP {resp.status_code}")
+                    settled = True
+                    if resp.status_code in RETRY_STATUSES and attempt < retries:
+                        attempt += 1
+                        resp.close()
+                        _logger.info("[Monta] %s %s -> %s; retry %s/%s", method, url, resp.status_code, attempt, retries)
+                        time.sleep(self._backoff(attempt))
+                        breaker.before()
+                        settled = False
+                        continue
+                    return resp
+                breaker.success()
+                settled = True
+                return resp
+        finally:
+            if not settled:
+                breaker.release()
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+
+def pool_size_from_env(env) -> int:
+    ICP = env["ir.config_parameter"].sudo()
+    try:
+        return max(1, int(ICP.get_param("monta.http_pool_size") or DEFAULT_POOL_SIZE))
+    except Exception:
+        return DEFAULT_POOL_SIZE
+
+
+def _resilience_conf(env):
+    ICP = env["ir.config_parameter"].sudo()
+    try:
+        return (max(0, int(ICP.get_param("monta.http_retries") or DEFAULT_RETRIES)),
+                int(ICP.get_param("monta.circuit_threshold") or DEFAULT_THRESHOLD),
+                float(ICP.get_param("monta.circuit_cooldown") or DEFAULT_COOLDOWN))
+    except ValueError:
+        return DEFAULT_RETRIES, DEFAULT_THRESHOLD, DEFAULT_COOLDOWN
+
+
+def _rate_limit_conf(env):
+    ICP = env["ir.config_parameter"].sudo()
+    try:
+        return (float(ICP.get_param("monta.rate_limit_per_sec") or DEFAULT_RATE),
+                float(ICP.get_param("monta.rate_limit_burst") or DEFAULT_BURST),
+                float(ICP.get_param("monta.rate_limit_reserve") or DEFAULT_RESERVE))
+    except ValueError:
+        return DEFAULT_RATE, DEFAULT_BURST, DEFAULT_RESERVE
+
+
+def get_transport(env, base, user, pwd, pool_size=None) -> MontaTransport:
+    """
+    Return the shared transport for this account, creating it on first use.
+    A bigger pool_size than the cached one (e.g. a parallel fetch stage) rebuilds the pool.
+    """
+    size = int(pool_size or pool_size_from_env(env))
+    pwd_hash = hashlib.sha1((pwd or "").encode("utf-8")).hexdigest()
+    cache_key = (env.cr.dbname, account_key(base, user), pwd_hash)
+    with _LOCK:
+        tr = _TRANSPORTS.get(cache_key)
+        if tr is None or tr.pool_size < size:
+            tr = MontaTransport(base, user, pwd, pool_size=size)
+            _TRANSPORTS[cache_key] = tr
+            _logger.info("[Monta] HTTP transport ready for %s (pool=%s)", tr.base, tr.pool_size)
+        # rate limit settings are re-read on every call so parameter changes apply without a restart
+        rate, burst, reserve = _rate_limit_conf(env)
+        if tr.limiter is None:
+            tr.limiter = MontaRateLimiter(env.cr.dbname, tr.key, rate, burst, reserve)
+        else:
+            tr.limiter.configure(rate, burst, reserve)
+        tr.dbname = env.cr.dbname
+        tr.retries, threshold, cooldown = _resilience_conf(env)
+        tr.breaker_conf = (threshold, cooldown)
+        return tr
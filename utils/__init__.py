@@ -3,4 +3,5 @@ from . import address
 from . import pack
 from . import sku
 from . import eta  
-from . import log_silencer
\ No newline at end of file
+from . import log_silencer
+from . import kit
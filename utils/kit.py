@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Kit feasibility: how many packs can be built from component on-hand.
+
+All kits are computed in one pass. With NumPy available the kit x component
+requirement matrix is held in sparse (COO) form: one ratio onhand/need per BoM line,
+reduced per kit with np.minimum.at. Without NumPy the same result is computed
+with a plain loop.
+"""
+import math
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+
+def phantom_boms(env, products) -> Dict[int, object]:
+    """
+    {product.id: phantom mrp.bom} for the kits among `products`, from one mrp.bom search.
+    BoM choice per product: its variant BoM first, then the template BoM, first one in
+    mrp.bom _order (like search(limit=1)).
+    """
+    if not products:
+        return {}
+    boms = env["mrp.bom"].search([("product_tmpl_id", "in", products.product_tmpl_id.ids)])
+    by_variant, by_tmpl = {}, {}
+    for bom in boms:
+        if bom.product_id:
+            by_variant.setdefault(bom.product_id.id, bom)
+        else:
+            by_tmpl.setdefault(bom.product_tmpl_id.id, bom)
+    out = {}
+    for product in products:
+        bom = by_variant.get(product.id) or by_tmpl.get(product.product_tmpl_id.id)
+        if bom and bom.type == "phantom":
+            out[product.id] = bom
+    return out
+
+
+def max_packs(kit_lines: Dict[int, List[Tuple[int, float]]],
+              onhand: Dict[int, float],
+              caps: Dict[int, float] = None) -> Dict[int, float]:
+    """
+    kit_lines: {kit_id: [(component_id, qty_per_pack), ...]}
+    onhand:    {component_id: on-hand qty}
+    caps:      optional {kit_id: upper bound} (e.g. Monta StockAvailable of the kit)
+    Returns {kit_id: buildable packs >= 0} (fractional; floor it for display).
+    """
+    caps = caps or {}
+    kits = list(kit_lines)
+    if not kits:
+        return {}
+    if np is None:
+        return _max_packs_py(kit_lines, onhand, caps)
+
+    kit_idx, comp_ids, need = [], [], []
+    for i, kit in enumerate(kits):
+        for comp_id, qty in kit_lines[kit]:
+            if qty and qty > 0:
+                kit_idx.append(i)
+                comp_ids.append(comp_id)
+                need.append(qty)
+
+    result = np.full(len(kits), np.inf)
+    if kit_idx:
+        comps = sorted(set(comp_ids))
+        pos = {c: j for j, c in enumerate(comps)}
+        onhand_vec = np.array([onhand.get(c, 0.0) for c in comps], dtype=float)
+        ratios = onhand_vec[np.array([pos[c] for c in comp_ids])] / np.array(need, dtype=float)
+        np.minimum.at(result, np.array(kit_idx), ratios)
+    result[np.isinf(result)] = 0.0
+
+    cap_vec = np.array([max(0.0, caps[k]) if k in caps else np.inf for k in kits], dtype=float)
+    result = np.maximum(np.minimum(result, cap_vec), 0.0)
+    return dict(zip(kits, result.tolist()))
+
+
+def _max_packs_py(kit_lines, onhand, caps):
+    out = {}
+    for kit, lines in kit_lines.items():
+        possible = math.inf
+        for comp_id, qty in lines:
+            if qty and qty > 0:
+                possible = min(possible, onhand.get(comp_id, 0.0) / qty)
+        if math.isinf(possible):
+            possible = 0.0
+        if kit in caps:
+            possible = min(possible, max(0.0, caps[kit]))
+        out[kit] = max(0.0, float(possible))
+    return out
@@ -44,3 +44,8 @@ def resolve_sku(product, env: Environment = None, allow_synthetic: bool = False)
 
 def resolve_sku_strict(product, env: Environment = None) -> Tuple[str, str]:
     return resolve_sku(product, env=env, allow_synthetic=False)
+
+
+def normalize_sku(sku) -> str:
+    """Lookup key for SKU matching (monta.sku.index): trimmed, otherwise exact (case-sensitive)."""
+    return str(sku or '').strip()